@@ -1 +1,3 @@
 from .inject_expectation import *  # noqa: F401,F403
+from .matcher import *  # noqa: F401,F403
+from .store import *  # noqa: F401,F403
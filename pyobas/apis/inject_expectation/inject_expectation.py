@@ -1,10 +1,11 @@
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 from pyobas import exceptions as exc
-from pyobas.apis.inject_expectation.model import (
+from pyobas.apis.inject_expectation.model import (  # noqa: F401
     DetectionExpectation,
     ExpectationTypeEnum,
     PreventionExpectation,
+    build_expectations,
 )
 from pyobas.base import RESTManager, RESTObject
 from pyobas.mixins import ListMixin, UpdateMixin
@@ -46,32 +47,33 @@ class InjectExpectationManager(ListMixin, UpdateMixin, RESTManager):
         :return: a list of expectation objects
         :rtype: list[DetectionExpectation|PreventionExpectation]
         """
-        # TODO: we should implement a more clever mechanism to obtain
-        #   specialised Expectation instances rather than just if/elseing
-        #   through this list of possibilities.
-        expectations = []
-        for expectation_dict in self.expectations_assets_for_source(
-            source_id=source_id, **kwargs
-        ):
-            if (
-                expectation_dict["inject_expectation_type"]
-                == ExpectationTypeEnum.Detection.value
-            ):
-                expectations.append(
-                    DetectionExpectation(**expectation_dict, api_client=self)
-                )
-            elif (
-                expectation_dict["inject_expectation_type"]
-                == ExpectationTypeEnum.Prevention.value
-            ):
-                expectations.append(
-                    PreventionExpectation(**expectation_dict, api_client=self)
-                )
-            else:
-                expectations.append(
-                    PreventionExpectation(**expectation_dict, api_client=self)
-                )
-        return expectations
+        return self.expectation_models(
+            self.expectations_assets_for_source(source_id=source_id, **kwargs)
+        )
+
+    def expectation_models(self, expectation_dicts: List[Dict[str, Any]]):
+        """Builds the expectation objects for expectations returned by OpenBAS,
+            all at once.
+
+        :param expectation_dicts: the expectations as returned by OpenBAS
+        :type expectation_dicts: list[dict]
+
+        :return: a list of expectation objects
+        :rtype: list[DetectionExpectation|PreventionExpectation]
+        """
+        return build_expectations(expectation_dicts, api_client=self)
+
+    def expectation_model(self, expectation_dict: Dict[str, Any]):
+        """Builds the expectation object matching the type of an expectation
+            returned by OpenBAS.
+
+        :param expectation_dict: the expectation as returned by OpenBAS
+        :type expectation_dict: dict
+
+        :return: the expectation object
+        :rtype: DetectionExpectation|PreventionExpectation
+        """
+        return self.expectation_models([expectation_dict])[0]
 
     @exc.on_http_error(exc.OpenBASUpdateError)
     def prevention_expectations_for_source(
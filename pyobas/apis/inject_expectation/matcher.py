@@ -0,0 +1,247 @@
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from pyobas.apis.inject_expectation.model.expectation import (
+    Expectation,
+    ExpectationSignature,
+)
+from pyobas.signatures.fuzzy import FuzzyIndex
+from pyobas.signatures.ip import IPNetworkIndex, parse_network
+from pyobas.signatures.planner import MatchPlanner
+from pyobas.signatures.regex import RegexSet, regex_set_for
+from pyobas.signatures.signature_type import SignatureType
+from pyobas.signatures.types import MatchTypes
+
+__all__ = ["ExpectationMatcher"]
+
+
+def _alert_values(data: Any) -> Optional[List[Any]]:
+    """Returns the alert values the way Expectation.match_fuzzy reads them, or
+    None when they cannot be used for a lookup."""
+    if isinstance(data, str):
+        return [data]
+    if isinstance(data, (list, tuple)):
+        return list(data)
+    return None
+
+
+def _threshold(alert_signature: Dict[str, Any]) -> Optional[int]:
+    """Returns the threshold Expectation.match_alert applies to an alert
+    signature, or None when it does not score it."""
+    if alert_signature.get("type") == MatchTypes.MATCH_TYPE_SIMPLE:
+        return 100
+    if alert_signature.get("type") == MatchTypes.MATCH_TYPE_FUZZY:
+        return alert_signature.get("score")
+    return None
+
+
+class _AnchorIndex:
+    """The anchor values of one signature type, and the expectation groups
+    anchored on each of them."""
+
+    def __init__(self):
+        self.positions: Dict[str, List[int]] = {}
+        self._values: Optional[FuzzyIndex] = None
+        self._patterns: Optional[RegexSet] = None
+        self._networks: Optional[IPNetworkIndex] = None
+
+    def add(self, value: str, position: int) -> None:
+        self.positions.setdefault(value, []).append(position)
+        self._values = None
+        self._patterns = None
+        self._networks = None
+
+    def all_positions(self) -> Iterable[int]:
+        for positions in self.positions.values():
+            yield from positions
+
+    def matching_positions(self, value: str, threshold: int) -> Iterable[int]:
+        if self._values is None:
+            self._values = FuzzyIndex(list(self.positions))
+        for index in self._values.candidates(value, threshold):
+            yield from self.positions[self._values.references[index]]
+
+    def regex_matching_positions(self, value: str) -> Iterable[int]:
+        # the anchor values are the expressions: all of them are searched in
+        # the alert value at once, and the combined expression is shared with
+        # the other matchers built on the same anchors
+        if self._patterns is None:
+            self._patterns = regex_set_for(tuple(self.positions))
+        for index in self._patterns.matching(value):
+            yield from self.positions[self._patterns.patterns[index]]
+
+    def ip_matching_positions(self, value: str) -> Iterable[int]:
+        # the anchor values are IP addresses or ranges, and the ones that are
+        # not never match
+        if self._networks is None:
+            self._networks = IPNetworkIndex()
+            for anchor_value in self.positions:
+                if (network := parse_network(anchor_value)) is not None:
+                    self._networks.add(network, anchor_value)
+        if (network := parse_network(value)) is None:
+            return
+        for anchor_value in self._networks.containing(network):
+            yield from self.positions[anchor_value]
+
+
+class ExpectationMatcher:
+    """Finds the expectations matching an alert without testing every
+    expectation against it.
+
+    Each expectation is indexed on one of its relevant signatures, its
+    *anchor*: since an alert must match all the relevant signatures of an
+    expectation, it must match the anchor too. The anchor values of each
+    signature type are stored in a FuzzyIndex, so an alert value is only
+    compared with the anchor values that can reach the alert threshold; for
+    regex alert signatures, the anchor expressions of a type are searched in
+    each alert value at once with a RegexSet, and for IP alert signatures the
+    anchor ranges are looked up in an IPNetworkIndex. The candidate
+    expectations are then confirmed with Expectation.match_alert, which makes
+    the results identical to calling match_alert on every expectation.
+
+    Expectations with the same relevant signatures (e.g. the expectations of
+    one inject on every targeted asset) are grouped and only their group is
+    indexed and confirmed: the matching cost follows the number of distinct
+    signature sets rather than the number of expectations.
+
+    :param expectations: the expectations to match alerts against
+    :type expectations: list[Expectation]
+    :param relevant_signature_types: filter of signature types that we want
+        to consider, as for Expectation.match_alert
+    :type relevant_signature_types: list[SignatureType]
+    :param planner: orders the signature checks of the candidates, as for
+        Expectation.match_alert
+    :type planner: MatchPlanner, optional
+    """
+
+    def __init__(
+        self,
+        expectations: Iterable[Expectation],
+        relevant_signature_types: List[SignatureType],
+        planner: Optional[MatchPlanner] = None,
+    ):
+        self._expectations = list(expectations)
+        self._relevant_signature_types = relevant_signature_types
+        self._planner = planner
+        relevant_labels = [type.label for type in relevant_signature_types]
+        # the higher the threshold, the fewer alert values an anchor matches
+        self._anchor_thresholds = {
+            type.label: (
+                100
+                if type.match_policy.match_type == MatchTypes.MATCH_TYPE_SIMPLE
+                else type.match_policy.match_score or 0
+            )
+            for type in relevant_signature_types
+        }
+
+        # expectations with the same relevant signatures match the same
+        # alerts: they are grouped, and each group is matched once through its
+        # first expectation
+        self._groups: List[List[int]] = []
+        group_ids: Dict[FrozenSet[Tuple[str, str]], int] = {}
+        # signature type -> anchor values and anchored group ids
+        self._anchors: Dict[str, _AnchorIndex] = {}
+        for position, expectation in enumerate(self._expectations):
+            relevant_signatures = [
+                signature
+                for signature in expectation.inject_expectation_signatures
+                if signature.type in relevant_labels
+            ]
+            if not relevant_signatures:
+                # can never match
+                continue
+            fingerprint = frozenset(
+                (signature.type.value, signature.value)
+                for signature in relevant_signatures
+            )
+            if (group_id := group_ids.get(fingerprint)) is not None:
+                self._groups[group_id].append(position)
+                continue
+            group_id = group_ids[fingerprint] = len(self._groups)
+            self._groups.append([position])
+            anchor = self._choose_anchor(relevant_signatures)
+            self._anchors.setdefault(anchor.type.value, _AnchorIndex()).add(
+                anchor.value, group_id
+            )
+
+    def _choose_anchor(
+        self, signatures: List[ExpectationSignature]
+    ) -> ExpectationSignature:
+        return max(
+            signatures, key=lambda signature: self._anchor_thresholds[signature.type]
+        )
+
+    def __len__(self) -> int:
+        return len(self._expectations)
+
+    @property
+    def group_count(self) -> int:
+        """Number of distinct relevant signature sets, i.e. of match_alert
+        calls needed at most to match an alert."""
+        return len(self._groups)
+
+    def _expectations_of(self, group_ids: Iterable[int]) -> List[Expectation]:
+        positions = sorted(
+            position for group_id in group_ids for position in self._groups[group_id]
+        )
+        return [self._expectations[position] for position in positions]
+
+    def candidates(self, alert_data: Dict[str, Dict[str, Any]]) -> List[Expectation]:
+        """Returns the expectations that may match the alert, in their
+        original order. Every expectation matching the alert is included.
+
+        :param alert_data: list of possibly relevant markers found in an alert.
+        :type alert_data: dict[SignatureTypes, dict]
+
+        :return: the candidate expectations
+        :rtype: list[Expectation]
+        """
+        return self._expectations_of(self._candidate_groups(alert_data))
+
+    def _candidate_groups(self, alert_data: Dict[str, Dict[str, Any]]) -> Set[int]:
+        group_ids = set()
+        for label, anchors in self._anchors.items():
+            if not (alert_signature := alert_data.get(label)):
+                continue
+            values = _alert_values(alert_signature.get("data"))
+            lookup = {
+                MatchTypes.MATCH_TYPE_REGEX: anchors.regex_matching_positions,
+                MatchTypes.MATCH_TYPE_IP: anchors.ip_matching_positions,
+            }.get(alert_signature.get("type"))
+            if (
+                lookup is not None
+                and values is not None
+                and all(isinstance(value, str) for value in values)
+            ):
+                for value in values:
+                    group_ids.update(lookup(value))
+                continue
+            threshold = _threshold(alert_signature)
+            if (
+                threshold is None
+                or values is None
+                or not all(isinstance(value, str) for value in values)
+            ):
+                # cannot be looked up: let match_alert decide
+                group_ids.update(anchors.all_positions())
+                continue
+            for value in values:
+                group_ids.update(anchors.matching_positions(value, threshold))
+        return group_ids
+
+    def match(self, alert_data: Dict[str, Dict[str, Any]]) -> List[Expectation]:
+        """Returns the expectations matching the alert, in their original order:
+        the same result as calling Expectation.match_alert on each of them.
+
+        :param alert_data: list of possibly relevant markers found in an alert.
+        :type alert_data: dict[SignatureTypes, dict]
+
+        :return: the matching expectations
+        :rtype: list[Expectation]
+        """
+        return self._expectations_of(
+            group_id
+            for group_id in self._candidate_groups(alert_data)
+            if self._expectations[self._groups[group_id][0]].match_alert(
+                self._relevant_signature_types, alert_data, self._planner
+            )
+        )
@@ -2,6 +2,12 @@ from .expectation import (
     DetectionExpectation,
     ExpectationTypeEnum,
     PreventionExpectation,
+    build_expectations,
 )
 
-__all__ = ["DetectionExpectation", "ExpectationTypeEnum", "PreventionExpectation"]
+__all__ = [
+    "DetectionExpectation",
+    "ExpectationTypeEnum",
+    "PreventionExpectation",
+    "build_expectations",
+]
@@ -1,10 +1,13 @@
 from enum import Enum
-from typing import List
+from typing import Any, Dict, Iterable, List
 from uuid import UUID
 
-from pydantic import BaseModel
-from thefuzz import fuzz
+from pydantic import BaseModel, Field, TypeAdapter
 
+from pyobas.signatures import fuzzy, ip
+from pyobas.signatures.aho_corasick import automaton_for
+from pyobas.signatures.planner import MatchPlanner
+from pyobas.signatures.regex import compile_pattern
 from pyobas.signatures.signature_type import SignatureType
 from pyobas.signatures.types import MatchTypes, SignatureTypes
 
@@ -46,9 +49,8 @@ class Expectation(BaseModel):
     success_label: str = "Success"
     failure_label: str = "Failure"
 
-    def __init__(self, *a, **kw):
-        super().__init__(*a, **kw)
-        self.__api_client = kw["api_client"]
+    # client used to update the expectation, e.g. an InjectExpectationManager
+    api_client: Any = Field(default=None, exclude=True, repr=False)
 
     def update(self, success, sender_id, metadata):
         """Update the expectation object in OpenBAS with the supplied outcome.
@@ -60,7 +62,7 @@ class Expectation(BaseModel):
         :param metadata: arbitrary dictionary of additional data relevant to updating the expectation
         :type metadata: dict[string,string]
         """
-        self.__api_client.update(
+        self.api_client.update(
             self.inject_expectation_id,
             inject_expectation={
                 "collector_id": sender_id,
@@ -70,7 +72,12 @@ class Expectation(BaseModel):
             },
         )
 
-    def match_alert(self, relevant_signature_types: list[SignatureType], alert_data):
+    def match_alert(
+        self,
+        relevant_signature_types: list[SignatureType],
+        alert_data,
+        planner: MatchPlanner = None,
+    ):
         """Matches an alert's data against the current expectation signatures
         to see if the alert is relevant to the current expectation's inject,
         i.e. this alert was triggered by the execution of the inject to which
@@ -81,18 +88,28 @@ class Expectation(BaseModel):
         :type relevant_signature_types: list[SignatureType]
         :param alert_data: list of possibly relevant markers found in an alert.
         :type alert_data: dict[SignatureTypes, dict]
+        :param planner: orders the signature checks so that the ones most
+            likely to reject the alert cheaply run first, and learns from
+            their results; the result is the same, defaults to None (the
+            order of the expectation signatures)
+        :type planner: MatchPlanner, optional
 
         :return: whether the alert matches the expectation signatures or not.
         :rtype: bool
         """
+        relevant_labels = [type.label for type in relevant_signature_types]
         relevant_expectation_signatures = [
             signature
             for signature in self.inject_expectation_signatures
-            if signature.type in [type.label for type in relevant_signature_types]
+            if signature.type in relevant_labels
         ]
         if not any(relevant_expectation_signatures):
             return False
 
+        if planner is not None:
+            relevant_expectation_signatures = planner.order(
+                relevant_expectation_signatures, alert_data
+            )
         for relevant_expectation_signature in relevant_expectation_signatures:
             if not (
                 alert_signature_for_type := alert_data.get(
@@ -101,23 +118,47 @@ class Expectation(BaseModel):
             ):
                 return False
 
-            if alert_signature_for_type[
-                "type"
-            ] == MatchTypes.MATCH_TYPE_FUZZY and not self.match_fuzzy(
-                alert_signature_for_type["data"],
-                relevant_expectation_signature.value,
-                alert_signature_for_type["score"],
-            ):
-                return False
-            if alert_signature_for_type[
-                "type"
-            ] == MatchTypes.MATCH_TYPE_SIMPLE and not self.match_simple(
-                alert_signature_for_type["data"], relevant_expectation_signature.value
-            ):
+            matched = self.match_signature(
+                alert_signature_for_type, relevant_expectation_signature.value
+            )
+            if planner is not None:
+                planner.record(
+                    relevant_expectation_signature, alert_signature_for_type, matched
+                )
+            if not matched:
                 return False
 
         return True
 
+    def match_signature(self, alert_signature: dict, reference: str) -> bool:
+        """Matches an alert signature against the value of an expectation
+        signature, with the match type of the alert signature.
+
+        :param alert_signature: an alert signature, as made by
+            SignatureType.make_struct_for_matching
+        :type alert_signature: dict
+        :param reference: the value of the expectation signature
+        :type reference: str
+
+        :return: whether the alert signature matches, always True for unknown
+            match types
+        :rtype: bool
+        """
+        match_type = alert_signature["type"]
+        if match_type == MatchTypes.MATCH_TYPE_FUZZY:
+            return self.match_fuzzy(
+                alert_signature["data"], reference, alert_signature["score"]
+            )
+        if match_type == MatchTypes.MATCH_TYPE_SIMPLE:
+            return self.match_simple(alert_signature["data"], reference)
+        if match_type == MatchTypes.MATCH_TYPE_SUBSTRING:
+            return self.match_substring(alert_signature["data"], reference)
+        if match_type == MatchTypes.MATCH_TYPE_REGEX:
+            return self.match_regex(alert_signature["data"], reference)
+        if match_type == MatchTypes.MATCH_TYPE_IP:
+            return self.match_ip(alert_signature["data"], reference)
+        return True
+
     @staticmethod
     def match_fuzzy(tested: list[str], reference: str, threshold: int):
         """Applies a fuzzy match against a known reference to a list of candidates
@@ -133,9 +174,8 @@ class Expectation(BaseModel):
         :rtype: bool
         """
         actual_tested = [tested] if isinstance(tested, str) else tested
-        for value in actual_tested:
-            ratio = fuzz.ratio(value, reference)
-            if ratio >= threshold:
+        for tested_item in actual_tested:
+            if fuzzy.ratio(tested_item, reference) >= threshold:
                 return True
         return False
 
@@ -154,6 +194,58 @@ class Expectation(BaseModel):
         """
         return Expectation.match_fuzzy(tested, reference, threshold=100)
 
+    @staticmethod
+    def match_substring(tested: list[str], reference: str):
+        """A case-insensitive match of a reference containing any of a list of
+            candidates, e.g. a command line containing a process name.
+
+        :param tested: list of strings candidate for substring matching
+        :type tested: list[str]
+        :param reference: the reference in which to look for the candidates
+        :type reference: str
+
+        :return: whether any of the candidate occurs in the reference
+        :rtype: bool
+        """
+        actual_tested = [tested] if isinstance(tested, str) else tested
+        return automaton_for(
+            tuple(value.strip().lower() for value in actual_tested)
+        ).search_any(reference.strip().lower())
+
+    @staticmethod
+    def match_regex(tested: list[str], reference: str):
+        """Searches a regular expression reference in a list of candidates.
+
+        :param tested: list of strings candidate for regex matching
+        :type tested: list[str]
+        :param reference: the regular expression to search for; an invalid
+            expression never matches
+        :type reference: str
+
+        :return: whether the reference is found in any of the candidate
+        :rtype: bool
+        """
+        if (pattern := compile_pattern(reference)) is None:
+            return False
+        actual_tested = [tested] if isinstance(tested, str) else tested
+        return any(pattern.search(value) for value in actual_tested)
+
+    @staticmethod
+    def match_ip(tested: list[str], reference: str):
+        """Matches IP addresses against a reference IP address or CIDR range.
+
+        :param tested: list of IP addresses (or ranges) candidate for matching
+        :type tested: list[str]
+        :param reference: the IP address or CIDR range, e.g. "10.0.0.0/8";
+            a value that is not an IP address or range never matches
+        :type reference: str
+
+        :return: whether any of the candidate is within the reference
+        :rtype: bool
+        """
+        actual_tested = [tested] if isinstance(tested, str) else tested
+        return ip.any_within(actual_tested, reference)
+
 
 class DetectionExpectation(Expectation):
     """An expectation that is specific to Detection, i.e. that is used
@@ -171,3 +263,55 @@ class PreventionExpectation(Expectation):
 
     success_label: str = "Prevented"
     failure_label: str = "Not Prevented"
+
+
+_detections_adapter = TypeAdapter(List[DetectionExpectation])
+_preventions_adapter = TypeAdapter(List[PreventionExpectation])
+
+
+def build_expectations(
+    expectation_dicts: Iterable[Dict[str, Any]], api_client: Any = None
+) -> List[Expectation]:
+    """Builds the expectation objects for a list of expectations returned by
+    OpenBAS: Detection expectations are DetectionExpectation, all the others
+    are PreventionExpectation. The expectations are split by type, then each
+    group is validated in a single pass rather than one model at a time.
+
+    :param expectation_dicts: the expectations as returned by OpenBAS
+    :type expectation_dicts: list[dict]
+    :param api_client: the client used to update the expectations
+    :type api_client: InjectExpectationManager, optional
+
+    :return: a list of expectation objects
+    :rtype: list[DetectionExpectation|PreventionExpectation]
+    """
+    expectation_dicts = list(expectation_dicts)
+    detection = ExpectationTypeEnum.Detection.value
+    is_detection = [
+        expectation_dict.get("inject_expectation_type") == detection
+        for expectation_dict in expectation_dicts
+    ]
+    detections = iter(
+        _detections_adapter.validate_python(
+            [
+                expectation_dict
+                for expectation_dict, flag in zip(expectation_dicts, is_detection)
+                if flag
+            ]
+        )
+    )
+    preventions = iter(
+        _preventions_adapter.validate_python(
+            [
+                expectation_dict
+                for expectation_dict, flag in zip(expectation_dicts, is_detection)
+                if not flag
+            ]
+        )
+    )
+    expectations = [
+        next(detections) if flag else next(preventions) for flag in is_detection
+    ]
+    for expectation in expectations:
+        expectation.api_client = api_client
+    return expectations
@@ -0,0 +1,222 @@
+import heapq
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+__all__ = ["ExpectationDelta", "ExpectationStore"]
+
+
+class ExpectationDelta(NamedTuple):
+    """What changed in an ExpectationStore during a sync.
+
+    Updated expectations are the ones whose content changed on the server:
+    their objects were rebuilt.
+    """
+
+    added: List[Any]
+    updated: List[Any]
+    removed: List[Any]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+
+class ExpectationStore:
+    """Local copy of the expectations pending for a source (e.g. a collector),
+    keyed by ``inject_expectation_id``.
+
+    Each sync downloads the pending expectations and compares them with the
+    local copy: only the new or changed expectations are validated into
+    expectation objects, the others are kept as they are, and the ones no
+    longer pending are dropped. Matching and indexing structures can be kept
+    up to date from the returned ExpectationDelta.
+
+    With an `expiration_time`, each expectation also expires on its own:
+    `expiration_time` minutes after its ``inject_expectation_created_at``
+    date, or after it was first synced when OpenBAS does not send it. Expired
+    expectations are evicted at each sync or by evict_expired(), using a
+    min-heap of the expiry dates, and next_expiration() tells when the next
+    one expires, e.g. to plan the next poll.
+
+    :param manager: the manager used to download and update the expectations
+    :type manager: InjectExpectationManager
+    :param source_id: the identifier of the collector requesting expectations
+    :type source_id: str
+    :param expiration_time: time in minutes after which expectations expire,
+        also sent to OpenBAS when syncing
+    :type expiration_time: int, optional
+    :param expires_at: returns the expiry timestamp of an expectation as sent
+        by OpenBAS, or None if it never expires; overrides `expiration_time`
+    :type expires_at: callable, optional
+    :param clock: returns the current timestamp, defaults to time.time
+    :type clock: callable, optional
+    """
+
+    def __init__(
+        self,
+        manager: Any,
+        source_id: str,
+        expiration_time: Optional[int] = None,
+        expires_at: Optional[Callable[[Dict[str, Any]], Optional[float]]] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.manager = manager
+        self.source_id = source_id
+        self.expiration_time = expiration_time
+        self._expires_at = expires_at
+        self._clock = clock
+        self._raw: Dict[str, Dict[str, Any]] = {}
+        self._expectations: Dict[str, Any] = {}
+        # expiry of each expectation, and a heap of (expiry, id) that may hold
+        # outdated entries, skipped when they reach the top
+        self._expiries: Dict[str, float] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._first_seen: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._expectations)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._expectations.values())
+
+    def __contains__(self, inject_expectation_id: object) -> bool:
+        return str(inject_expectation_id) in self._expectations
+
+    def get(self, inject_expectation_id: Any) -> Any:
+        """Returns the expectation with this id, or None if it is not pending."""
+        return self._expectations.get(str(inject_expectation_id))
+
+    @property
+    def expectations(self) -> List[Any]:
+        """The pending expectations, in the order OpenBAS returned them."""
+        return list(self._expectations.values())
+
+    def sync(self, **kwargs: Any) -> ExpectationDelta:
+        """Downloads the pending expectations and applies the changes to the
+        local copy.
+
+        :param kwargs: additional data to pass to the endpoint
+        :type kwargs: dict, optional
+
+        :return: the added, updated and removed expectations
+        :rtype: ExpectationDelta
+        """
+        if self.expiration_time is not None:
+            kwargs.setdefault("expiration_time", self.expiration_time)
+        expectation_dicts = self.manager.expectations_assets_for_source(
+            source_id=self.source_id, **kwargs
+        )
+        return self.apply(expectation_dicts)
+
+    def apply(self, expectation_dicts: List[Dict[str, Any]]) -> ExpectationDelta:
+        """Replaces the local copy with `expectation_dicts`, the full list of
+        pending expectations, rebuilding only what changed.
+
+        :param expectation_dicts: the expectations as returned by OpenBAS
+        :type expectation_dicts: list[dict]
+
+        :return: the added, updated and removed expectations
+        :rtype: ExpectationDelta
+        """
+        now = self._clock()
+        raw: Dict[str, Dict[str, Any]] = {}
+        first_seen: Dict[str, float] = {}
+        changed_ids, changed_dicts, changed_expiries = [], [], []
+        for expectation_dict in expectation_dicts:
+            inject_expectation_id = str(expectation_dict["inject_expectation_id"])
+            first_seen[inject_expectation_id] = self._first_seen.get(
+                inject_expectation_id, now
+            )
+            if self._raw.get(inject_expectation_id) == expectation_dict:
+                raw[inject_expectation_id] = expectation_dict
+                continue
+            expiry = self._expiry(expectation_dict, first_seen[inject_expectation_id])
+            if expiry is not None and expiry <= now:
+                # already expired, even if OpenBAS still returns it
+                continue
+            raw[inject_expectation_id] = expectation_dict
+            changed_ids.append(inject_expectation_id)
+            changed_dicts.append(expectation_dict)
+            changed_expiries.append(expiry)
+        self._first_seen = first_seen
+
+        # only the new and changed expectations are built, in a single batch
+        built = dict(zip(changed_ids, self.manager.expectation_models(changed_dicts)))
+        added, updated = [], []
+        expectations: Dict[str, Any] = {}
+        for inject_expectation_id in raw:
+            if (expectation := built.get(inject_expectation_id)) is None:
+                expectations[inject_expectation_id] = self._expectations[
+                    inject_expectation_id
+                ]
+                continue
+            expectations[inject_expectation_id] = expectation
+            if inject_expectation_id in self._expectations:
+                updated.append(expectation)
+            else:
+                added.append(expectation)
+
+        removed = []
+        for inject_expectation_id, expectation in self._expectations.items():
+            if inject_expectation_id not in raw:
+                removed.append(expectation)
+                self._expiries.pop(inject_expectation_id, None)
+        self._raw, self._expectations = raw, expectations
+        for inject_expectation_id, expiry in zip(changed_ids, changed_expiries):
+            if expiry is None:
+                self._expiries.pop(inject_expectation_id, None)
+            else:
+                self._expiries[inject_expectation_id] = expiry
+                heapq.heappush(self._expiry_heap, (expiry, inject_expectation_id))
+        removed.extend(self.evict_expired(now))
+        return ExpectationDelta(added=added, updated=updated, removed=removed)
+
+    def _expiry(
+        self, expectation_dict: Dict[str, Any], first_seen: float
+    ) -> Optional[float]:
+        if self._expires_at is not None:
+            return self._expires_at(expectation_dict)
+        if self.expiration_time is None:
+            return None
+        created_at = expectation_dict.get("inject_expectation_created_at")
+        if created_at is not None:
+            created_at = datetime.fromisoformat(created_at).timestamp()
+        else:
+            created_at = first_seen
+        return created_at + self.expiration_time * 60
+
+    def _pop_outdated_expiries(self) -> None:
+        heap = self._expiry_heap
+        while heap and self._expiries.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def next_expiration(self) -> Optional[float]:
+        """Returns the timestamp at which the next expectation expires, or None
+        if no pending expectation expires."""
+        self._pop_outdated_expiries()
+        return self._expiry_heap[0][0] if self._expiry_heap else None
+
+    def evict_expired(self, now: Optional[float] = None) -> List[Any]:
+        """Drops the expectations that expired.
+
+        :param now: the current timestamp, defaults to the store clock
+        :type now: float, optional
+
+        :return: the evicted expectations
+        :rtype: list[DetectionExpectation|PreventionExpectation]
+        """
+        now = self._clock() if now is None else now
+        evicted = []
+        while (expiry := self.next_expiration()) is not None and expiry <= now:
+            _, inject_expectation_id = heapq.heappop(self._expiry_heap)
+            del self._expiries[inject_expectation_id]
+            del self._raw[inject_expectation_id]
+            evicted.append(self._expectations.pop(inject_expectation_id))
+        return evicted
+
+    def clear(self) -> None:
+        self._raw.clear()
+        self._expectations.clear()
+        self._expiries.clear()
+        self._expiry_heap.clear()
+        self._first_seen.clear()
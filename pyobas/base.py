@@ -1,28 +1,147 @@
+import collections
 import copy
 import importlib
 import json
+import pickle
 import pprint
 import textwrap
-from types import ModuleType
-from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Type, Union
-
-from pyobas.exceptions import OpenBASParsingError
-
-from . import utils
+import types
+import weakref
+from collections.abc import MutableSequence
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Type,
+    Union,
+)
+
+from pyobas.exceptions import OpenBASError, OpenBASParsingError
+
+from . import export, utils
 from .client import OpenBAS, OpenBASList
 
 __all__ = [
+    "CompactRESTObject",
     "RESTObject",
     "RESTObjectList",
     "RESTManager",
 ]
 
 
+class _CopyOnWriteList(MutableSequence):
+    """A list attribute of a RESTObject, as returned when reading it.
+
+    It is a view: reads go to the current data of the object without copying
+    it. The first mutation copies the server list into the object's updated
+    attributes, so the change is tracked and the server data is left
+    untouched; later reads of the attribute return that copy. Each object
+    hands out a single view per attribute, and any view writes to the same
+    copy. Use ``copy()`` or ``list()`` to get a plain list.
+    """
+
+    __slots__ = ("_obj", "_name")
+
+    def __init__(self, obj: "RESTObject", name: str) -> None:
+        self._obj = obj
+        self._name = name
+
+    def _data(self) -> List[Any]:
+        state = self._obj.__dict__
+        if self._name in state["_updated_attrs"]:
+            return state["_updated_attrs"][self._name]
+        return state["_attrs"].get(self._name, [])
+
+    def _track(self) -> List[Any]:
+        state = self._obj.__dict__
+        updated_attrs = state["_updated_attrs"]
+        if self._name not in updated_attrs:
+            updated_attrs[self._name] = list(state["_attrs"].get(self._name, []))
+        return updated_attrs[self._name]
+
+    def __getitem__(self, index: Any) -> Any:
+        return self._data()[index]
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        self._track()[index] = value
+
+    def __delitem__(self, index: Any) -> None:
+        del self._track()[index]
+
+    def __len__(self) -> int:
+        return len(self._data())
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._data())
+
+    def __contains__(self, value: Any) -> bool:
+        return value in self._data()
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, _CopyOnWriteList):
+            other = other._data()
+        return self._data() == other
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return repr(self._data())
+
+    def __add__(self, other: Any) -> List[Any]:
+        return self._data() + list(other)
+
+    def __radd__(self, other: Any) -> List[Any]:
+        return list(other) + self._data()
+
+    def __iadd__(self, values: Any) -> "_CopyOnWriteList":
+        self._track().extend(values)
+        return self
+
+    def __reduce_ex__(self, protocol: Any) -> Any:
+        return list, (self.copy(),)
+
+    def insert(self, index: int, value: Any) -> None:
+        self._track().insert(index, value)
+
+    def append(self, value: Any) -> None:
+        self._track().append(value)
+
+    def extend(self, values: Iterable[Any]) -> None:
+        self._track().extend(values)
+
+    def pop(self, index: int = -1) -> Any:
+        return self._track().pop(index)
+
+    def clear(self) -> None:
+        self._track().clear()
+
+    def reverse(self) -> None:
+        self._track().reverse()
+
+    def sort(self, *args: Any, **kwargs: Any) -> None:
+        self._track().sort(*args, **kwargs)
+
+    def copy(self) -> List[Any]:
+        return list(self._data())
+
+    def unwrap(self) -> List[Any]:
+        """Returns the tracked copy if there is one, else a copy of the data."""
+        if self._name in self._obj.__dict__["_updated_attrs"]:
+            return self._obj.__dict__["_updated_attrs"][self._name]
+        return self.copy()
+
+
 class RESTObject:
     _id_attr: Optional[str] = "id"
     _attrs: Dict[str, Any]
     _created_from_list: bool  # Indicates if object was created from a list() action
-    _module: ModuleType
     _parent_attrs: Dict[str, Any]
     _repr_attr: Optional[str] = None
     _updated_attrs: Dict[str, Any]
@@ -46,33 +165,96 @@ class RESTObject:
                 "manager": manager,
                 "_attrs": attrs,
                 "_updated_attrs": {},
-                "_module": importlib.import_module(self.__module__),
                 "_created_from_list": created_from_list,
             }
         )
         self.__dict__["_parent_attrs"] = self.manager.parent_attrs
-        self._create_managers()
 
-    def __getstate__(self) -> Dict[str, Any]:
-        state = self.__dict__.copy()
-        module = state.pop("_module")
-        state["_module_name"] = module.__name__
-        return state
+    def __reduce__(self) -> Any:
+        # Only the class reference and the data are serialized: the manager
+        # holds the API client and nested managers are rebuilt lazily, so
+        # both are left out and the object is bound again on load.
+        return _rebuild_rest_object, (
+            type(self),
+            self._attrs,
+            self._updated_attrs,
+            self._created_from_list,
+            self._parent_attrs,
+        )
+
+    def __copy__(self) -> "RESTObject":
+        # __reduce__ leaves the manager out for serialization, copies keep it
+        obj = type(self).__new__(type(self))
+        obj.__dict__.update(self.__dict__)
+        # list views write to the object they were read from
+        obj.__dict__.pop("_list_views", None)
+        return obj
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "RESTObject":
+        obj = type(self).__new__(type(self))
+        memo[id(self)] = obj
+        managers_plan = type(self)._get_managers_plan()
+        for name, value in self.__dict__.items():
+            if name == "manager":
+                obj.__dict__[name] = value
+            elif name != "_list_views" and name not in managers_plan:
+                # nested managers are rebuilt lazily, for the copy
+                obj.__dict__[name] = copy.deepcopy(value, memo)
+        return obj
 
     def __setstate__(self, state: Dict[str, Any]) -> None:
-        module_name = state.pop("_module_name")
+        # Objects pickled by older versions stored their whole state
+        state.pop("_module_name", None)
         self.__dict__.update(state)
-        self.__dict__["_module"] = importlib.import_module(module_name)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the object data, e.g. to cache it or to send it to
+        another process. The manager is not serialized."""
+        return pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def from_bytes(
+        data: bytes, manager: Optional["RESTManager"] = None
+    ) -> Union["RESTObject", "CompactRESTObject"]:
+        """Load an object serialized with to_bytes(), and bind it to `manager`.
+
+        Only load data from a trusted source: like pickle, this can run
+        arbitrary code.
+        """
+        obj = pickle.loads(data)
+        if manager is not None:
+            obj.bind(manager)
+        return obj
+
+    def bind(self, manager: "RESTManager") -> None:
+        """Attach the object to `manager`, e.g. after loading it."""
+        self.__dict__["manager"] = manager
+        self.__dict__["_parent_attrs"] = manager.parent_attrs
 
     def __getattr__(self, name: str) -> Any:
+        manager_cls = type(self)._get_managers_plan().get(name)
+        if manager_cls is not None:
+            if self.manager is None:
+                raise OpenBASError(
+                    f"{type(self).__name__!r} object is not bound to a manager, "
+                    f"call bind() first to use {name!r}"
+                )
+            # Nested managers are only created when first used
+            manager = manager_cls(self.manager.openbas, parent=self)
+            self.__dict__[name] = manager
+            return manager
+
         if name in self.__dict__["_updated_attrs"]:
             return self.__dict__["_updated_attrs"][name]
 
         if name in self.__dict__["_attrs"]:
             value = self.__dict__["_attrs"][name]
             if isinstance(value, list):
-                self.__dict__["_updated_attrs"][name] = value[:]
-                return self.__dict__["_updated_attrs"][name]
+                # In-place changes must be tracked, but only copied on mutation
+                views = self.__dict__.setdefault("_list_views", {})
+                if (view := views.get(name)) is None:
+                    view = views[name] = _CopyOnWriteList(self, name)
+                return view
 
             return value
 
@@ -90,6 +272,8 @@ class RESTObject:
         raise AttributeError(message)
 
     def __setattr__(self, name: str, value: Any) -> None:
+        if isinstance(value, _CopyOnWriteList):
+            value = value.unwrap()
         self.__dict__["_updated_attrs"][name] = value
 
     def asdict(self, *, with_parent_attrs: bool = False) -> Dict[str, Any]:
@@ -100,18 +284,31 @@ class RESTObject:
         data.update(copy.deepcopy(self._updated_attrs))
         return data
 
+    def asdict_view(self, *, with_parent_attrs: bool = False) -> Mapping[str, Any]:
+        """Returns a read-only view of the object data, without copying it.
+
+        The view follows later changes of the object. Unlike asdict(), values
+        are not copied: they must not be modified.
+        """
+        maps = [self._updated_attrs, self._attrs]
+        if with_parent_attrs:
+            maps.append(self._parent_attrs)
+        return types.MappingProxyType(collections.ChainMap(*maps))
+
     @property
     def attributes(self) -> Dict[str, Any]:
         return self.asdict(with_parent_attrs=True)
 
     def to_json(self, *, with_parent_attrs: bool = False, **kwargs: Any) -> str:
-        return json.dumps(self.asdict(with_parent_attrs=with_parent_attrs), **kwargs)
+        return json.dumps(
+            dict(self.asdict_view(with_parent_attrs=with_parent_attrs)), **kwargs
+        )
 
     def __str__(self) -> str:
-        return f"{type(self)} => {self.asdict()}"
+        return f"{type(self)} => {dict(self.asdict_view())}"
 
     def pformat(self) -> str:
-        return f"{type(self)} => \n{pprint.pformat(self.asdict())}"
+        return f"{type(self)} => \n{pprint.pformat(dict(self.asdict_view()))}"
 
     def pprint(self) -> None:
         print(self.pformat())
@@ -146,18 +343,33 @@ class RESTObject:
         return super() != other
 
     def __dir__(self) -> Iterable[str]:
-        return set(self.attributes).union(super().__dir__())
+        return (
+            set(self.asdict_view(with_parent_attrs=True))
+            .union(type(self)._get_managers_plan())
+            .union(super().__dir__())
+        )
 
     def __hash__(self) -> int:
         if not self.get_id():
             return super().__hash__()
         return hash(self.get_id())
 
-    def _create_managers(self) -> None:
+    @classmethod
+    def _get_managers_plan(cls) -> Dict[str, Type["RESTManager"]]:
+        """Returns the nested manager classes of this class, by attribute name.
+
+        The plan is computed once per class and cached on the class itself.
+        """
+        plan = cls.__dict__.get("_managers_plan")
+        if plan is not None:
+            return plan
+
         # NOTE(jlvillal): We are creating our managers by looking at the class
         # annotations. If an attribute is annotated as being a *Manager type
         # then we create the manager and assign it to the attribute.
-        for attr, annotation in sorted(self.__annotations__.items()):
+        module = importlib.import_module(cls.__module__)
+        plan = {}
+        for attr, annotation in sorted(cls.__annotations__.items()):
             # We ignore creating a manager for the 'manager' attribute as that
             # is done in the self.__init__() method
             if attr in ("manager",):
@@ -171,15 +383,87 @@ class RESTObject:
             # All *Manager classes are used except for the base "RESTManager" class
             if cls_name == "RESTManager" or not cls_name.endswith("Manager"):
                 continue
-            cls = getattr(self._module, cls_name)
-            manager = cls(self.manager.openbas, parent=self)
-            # Since we have our own __setattr__ method, we can't use setattr()
-            self.__dict__[attr] = manager
+            plan[attr] = getattr(module, cls_name)
+        cls._managers_plan = plan
+        return plan
+
+    @classmethod
+    def _get_compact_cls(cls) -> Type["CompactRESTObject"]:
+        """Returns the CompactRESTObject variant of this class."""
+        compact_cls = cls.__dict__.get("_compact_cls")
+        if compact_cls is None:
+            compact_cls = type(
+                f"Compact{cls.__name__}",
+                (CompactRESTObject,),
+                {
+                    "__slots__": (),
+                    "__module__": cls.__module__,
+                    "_id_attr": cls._id_attr,
+                    "_repr_attr": cls._repr_attr,
+                    "_obj_cls": cls,
+                },
+            )
+            cls._compact_cls = compact_cls
+        return compact_cls
 
     def _update_attrs(self, new_attrs: Dict[str, Any]) -> None:
         self.__dict__["_updated_attrs"] = {}
         self.__dict__["_attrs"] = new_attrs
 
+    def _get_updated_data(self) -> Dict[str, Any]:
+        """Returns the attributes whose value differs from the server data."""
+        attrs = self._attrs
+        return {
+            name: value
+            for name, value in self._updated_attrs.items()
+            if name not in attrs or attrs[name] != value
+        }
+
+    @property
+    def dirty_fields(self) -> List[str]:
+        """The names of the attributes changed since the object was fetched."""
+        return list(self._get_updated_data())
+
+    def save(self, **kwargs: Any) -> Optional[Dict[str, Any]]:
+        """Save the changes made to the object to the server.
+
+        When the manager updates with PATCH only the changed fields are sent,
+        otherwise the server data merged with the changes is sent. No request
+        is made when nothing changed.
+
+        Args:
+            **kwargs: Extra options to send to the server
+
+        Returns:
+            The new object data from the server, or None if nothing changed
+
+        Raises:
+            OpenBASError: If the manager does not support updates
+            OpenBASUpdateError: If the server cannot perform the request
+        """
+        updated_data = self._get_updated_data()
+        if not updated_data:
+            return None
+
+        # Import here to avoid circular imports
+        from pyobas.mixins import UpdateMethod, UpdateMixin
+
+        if not isinstance(self.manager, UpdateMixin):
+            raise OpenBASError(
+                f"{type(self.manager).__name__} does not support updates"
+            )
+
+        if self.manager._update_method is UpdateMethod.PATCH:
+            new_data = updated_data
+        else:
+            new_data = {**self._attrs, **updated_data}
+        server_data = self.manager.update(self.get_id(), new_data, **kwargs)
+        if isinstance(server_data, dict) and server_data:
+            self._update_attrs(server_data)
+        else:
+            self._update_attrs({**self._attrs, **updated_data})
+        return server_data
+
     def get_id(self) -> Optional[Union[int, str]]:
         """Returns the id of the resource."""
         if self._id_attr is None or not hasattr(self, self._id_attr):
@@ -209,9 +493,128 @@ class RESTObject:
         return obj_id
 
 
+class CompactRESTObject:
+    """A read-only and memory-compact counterpart of :class:`RESTObject`.
+
+    Instances have no ``__dict__``: they only hold their manager and the server
+    data. There is no change tracking nor nested managers, which makes them a
+    good fit to materialize large lists. Use ``ListMixin.list(compact=True)``
+    to get them.
+    """
+
+    __slots__ = ("manager", "_attrs")
+
+    _id_attr: Optional[str] = "id"
+    _repr_attr: Optional[str] = None
+    _obj_cls: Optional[Type[RESTObject]] = None  # the RESTObject class it mirrors
+    _attrs: Dict[str, Any]
+    manager: "RESTManager"
+
+    def __init__(
+        self,
+        manager: "RESTManager",
+        attrs: Dict[str, Any],
+        *,
+        created_from_list: bool = False,
+    ) -> None:
+        if not isinstance(attrs, dict):
+            raise OpenBASParsingError(
+                f"Attempted to initialize RESTObject with a non-dictionary value: "
+                f"{attrs!r}\nThis likely indicates an incorrect or malformed server "
+                f"response."
+            )
+        object.__setattr__(self, "manager", manager)
+        object.__setattr__(self, "_attrs", attrs)
+
+    def __reduce__(self) -> Any:
+        # Compact classes are built on the fly, so rebuild them from the
+        # RESTObject class they mirror. Like RESTObject, the manager is left
+        # out.
+        return _rebuild_compact_object, (self._obj_cls, self._attrs)
+
+    def __copy__(self) -> "CompactRESTObject":
+        return type(self)(self.manager, self._attrs)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "CompactRESTObject":
+        return type(self)(self.manager, copy.deepcopy(self._attrs, memo))
+
+    to_bytes = RESTObject.to_bytes
+    from_bytes = staticmethod(RESTObject.from_bytes)
+
+    def bind(self, manager: "RESTManager") -> None:
+        """Attach the object to `manager`, e.g. after loading it."""
+        object.__setattr__(self, "manager", manager)
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "_attrs":
+            raise AttributeError(name)
+        try:
+            return self._attrs[name]
+        except KeyError:
+            raise AttributeError(
+                f"{type(self).__name__!r} object has no attribute {name!r}"
+            ) from None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__!r} object is read-only")
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self._id_attr}:{self.get_id()}>"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CompactRESTObject):
+            return NotImplemented
+        if self.get_id() and other.get_id():
+            return self.get_id() == other.get_id()
+        return self is other
+
+    def __hash__(self) -> int:
+        if not self.get_id():
+            return id(self)
+        return hash(self.get_id())
+
+    def asdict(self) -> Dict[str, Any]:
+        return copy.deepcopy(self._attrs)
+
+    def get_id(self) -> Optional[Union[int, str]]:
+        """Returns the id of the resource."""
+        if self._id_attr is None:
+            return None
+        return self._attrs.get(self._id_attr)
+
+
+def _rebuild_rest_object(
+    obj_cls: Type[RESTObject],
+    attrs: Dict[str, Any],
+    updated_attrs: Dict[str, Any],
+    created_from_list: bool,
+    parent_attrs: Dict[str, Any],
+) -> RESTObject:
+    obj = obj_cls.__new__(obj_cls)
+    obj.__dict__.update(
+        {
+            "manager": None,
+            "_attrs": attrs,
+            "_updated_attrs": updated_attrs,
+            "_created_from_list": created_from_list,
+            "_parent_attrs": parent_attrs,
+        }
+    )
+    return obj
+
+
+def _rebuild_compact_object(
+    obj_cls: Type[RESTObject], attrs: Dict[str, Any]
+) -> CompactRESTObject:
+    return obj_cls._get_compact_cls()(None, attrs)  # type: ignore[arg-type]
+
+
 class RESTObjectList:
     def __init__(
-        self, manager: "RESTManager", obj_cls: Type[RESTObject], _list: OpenBASList
+        self,
+        manager: "RESTManager",
+        obj_cls: Type[Union[RESTObject, CompactRESTObject]],
+        _list: OpenBASList,
     ) -> None:
         self.manager = manager
         self._obj_cls = obj_cls
@@ -223,12 +626,43 @@ class RESTObjectList:
     def __len__(self) -> int:
         return len(self._list)
 
-    def __next__(self) -> RESTObject:
+    def __next__(self) -> Union[RESTObject, CompactRESTObject]:
         return self.next()
 
-    def next(self) -> RESTObject:
+    def next(self) -> Union[RESTObject, CompactRESTObject]:
         data = self._list.next()
-        return self._obj_cls(self.manager, data, created_from_list=True)
+        return self.manager._build_object(
+            data, obj_cls=self._obj_cls, created_from_list=True
+        )
+
+    def checkpoint(self) -> Dict[str, Any]:
+        """Returns the current position in the list, to be passed as
+        `resume_from` to :meth:`pyobas.mixins.ListMixin.list` to continue the
+        iteration later."""
+        return self._list.checkpoint()
+
+    def to_columns(self, fields: Sequence[str]) -> export.ColumnarBuffer:
+        """Loads the remaining items into a columnar buffer, straight from the
+        server data and without building any RESTObject."""
+        return self._list.to_columns(fields)
+
+    def export(
+        self,
+        fields: Sequence[str],
+        *,
+        csv_file: Optional[IO[str]] = None,
+        jsonl_file: Optional[IO[str]] = None,
+        chunk_size: int = export.DEFAULT_CHUNK_SIZE,
+    ) -> int:
+        """Writes the remaining items to CSV and/or JSONL files in chunks,
+        without building any RESTObject.
+
+        Returns:
+            The number of rows written
+        """
+        return self._list.export(
+            fields, csv_file=csv_file, jsonl_file=jsonl_file, chunk_size=chunk_size
+        )
 
     @property
     def current_page(self) -> int:
@@ -251,6 +685,14 @@ class RESTObjectList:
         """
         return self._list.next_page
 
+    @property
+    def next_cursor(self) -> Optional[str]:
+        """The cursor of the next page when keyset pagination is used.
+
+        If None, the server did not return a cursor for this page.
+        """
+        return self._list.next_cursor
+
     @property
     def per_page(self) -> Optional[int]:
         """The number of items per page."""
@@ -284,6 +726,7 @@ class RESTManager:
     _types: Dict[str, Any] = {}
 
     _computed_path: Optional[str]
+    _identity_map: Optional["weakref.WeakValueDictionary[Any, RESTObject]"] = None
     _parent: Optional[RESTObject]
     _parent_attrs: Dict[str, Any]
     openbas: OpenBAS
@@ -297,6 +740,58 @@ class RESTManager:
     def parent_attrs(self) -> Optional[Dict[str, Any]]:
         return self._parent_attrs
 
+    def enable_identity_map(self) -> None:
+        """Make the manager return a single instance per object id.
+
+        Objects built from server data whose id is already known refresh and
+        return the existing instance instead of creating a new one. Instances
+        are only weakly referenced, so the map never keeps them alive.
+        """
+        if self._identity_map is None:
+            self._identity_map = weakref.WeakValueDictionary()
+
+    def disable_identity_map(self) -> None:
+        self._identity_map = None
+
+    def _build_object(
+        self,
+        attrs: Dict[str, Any],
+        *,
+        obj_cls: Optional[Type[Union[RESTObject, "CompactRESTObject"]]] = None,
+        created_from_list: bool = False,
+    ) -> Union[RESTObject, "CompactRESTObject"]:
+        """Returns an object of `obj_cls` (``_obj_cls`` by default) for the
+        server data, going through the identity map when it is enabled."""
+        obj_cls = obj_cls or self._obj_cls
+        if TYPE_CHECKING:
+            assert obj_cls is not None
+        identity_map = self._identity_map
+        obj_id = (
+            attrs.get(obj_cls._id_attr)
+            if identity_map is not None
+            and obj_cls._id_attr
+            and isinstance(attrs, dict)
+            and issubclass(obj_cls, RESTObject)
+            else None
+        )
+        if obj_id is None:
+            return obj_cls(self, attrs, created_from_list=created_from_list)
+
+        obj = identity_map.get(obj_id)
+        if obj is None or type(obj) is not obj_cls:
+            obj = obj_cls(self, attrs, created_from_list=created_from_list)
+            identity_map[obj_id] = obj
+        else:
+            # Refreshed with the server data, but pending local changes are
+            # kept, and a list payload only holds a subset of the fields: it
+            # completes the data already loaded instead of replacing it
+            if created_from_list:
+                attrs = {**obj._attrs, **attrs}
+                created_from_list = obj._created_from_list
+            obj.__dict__["_attrs"] = attrs
+            obj.__dict__["_created_from_list"] = created_from_list
+        return obj
+
     def _compute_path(self, path: Optional[str] = None) -> Optional[str]:
         self._parent_attrs = {}
         if path is None:
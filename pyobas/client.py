@@ -1,9 +1,21 @@
-from typing import TYPE_CHECKING, Any, BinaryIO, Dict, List, Optional, Union
+import copy
+import time
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
 from urllib import parse
 
 import requests
 
-from pyobas import exceptions, utils
+from pyobas import exceptions, export, utils
 from pyobas._version import __version__  # noqa: F401
 
 REDIRECT_MSG = (
@@ -12,6 +24,15 @@ REDIRECT_MSG = (
     "{source!r} to {target!r}"
 )
 
+#: Response header carrying the opaque cursor of the next page (keyset pagination)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+#: Query parameter used to send the cursor back to the server
+CURSOR_PARAMETER = "cursor"
+#: HTTP status codes for which a page request is worth retrying
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+#: Number of times a page request is retried by default
+DEFAULT_PAGE_RETRIES = 3
+
 
 class OpenBAS:
     def __init__(
@@ -455,6 +476,7 @@ class OpenBAS:
         query_data: Optional[Dict[str, Any]] = None,
         *,
         iterator: Optional[bool] = None,
+        fields: Optional[Sequence[str]] = None,
         **kwargs: Any,
     ) -> Union["OpenBASList", List[Dict[str, Any]]]:
         query_data = query_data or {}
@@ -463,12 +485,18 @@ class OpenBAS:
 
         page = kwargs.get("page")
 
+        if kwargs.get("resume_from") is not None:
+            # A resumed list always continues to the end
+            return OpenBASList(self, url, query_data, fields=fields, **kwargs)
+
         if iterator and page is None:
             # Generator requested
-            return OpenBASList(self, url, query_data, **kwargs)
+            return OpenBASList(self, url, query_data, fields=fields, **kwargs)
 
         # pagination requested, we return a list
-        bas_list = OpenBASList(self, url, query_data, get_next=False, **kwargs)
+        bas_list = OpenBASList(
+            self, url, query_data, get_next=False, fields=fields, **kwargs
+        )
         items = list(bas_list)
         return items
 
@@ -478,6 +506,21 @@ class OpenBASList:
 
     The object handles the links returned by a query to the API, and will call
     the API again when needed.
+
+    When the server returns a cursor (``X-Next-Cursor`` header), the list
+    switches to keyset pagination: the next page is requested with that cursor
+    instead of a page number, so each page costs the same to the server and
+    concurrent inserts do not shift items between pages.
+
+    When `fields` is given, each page is projected on these fields as soon as it
+    is decoded and items are yielded as compact records (see
+    :func:`pyobas.utils.project`) instead of dicts.
+
+    The position in the list can be saved with :meth:`checkpoint` and a new
+    list can continue from it with `resume_from`, which only downloads again
+    the page that was being consumed. Each page request is retried up to
+    `max_retries` times (:data:`DEFAULT_PAGE_RETRIES` by default, or as saved
+    in the checkpoint) on connection errors and transient server errors.
     """
 
     def __init__(
@@ -486,30 +529,100 @@ class OpenBASList:
         url: str,
         query_data: Dict[str, Any],
         get_next: bool = True,
+        fields: Optional[Sequence[str]] = None,
+        resume_from: Optional[Dict[str, Any]] = None,
+        max_retries: Optional[int] = None,
         **kwargs: Any,
     ) -> None:
         self._openbas = openbas
+        if max_retries is None:
+            max_retries = (resume_from or {}).get("max_retries", DEFAULT_PAGE_RETRIES)
+        self._max_retries = max_retries
+        if resume_from is not None:
+            url = resume_from["url"]
+            query_data = resume_from["query_data"]
+            fields = resume_from["fields"]
+            kwargs = resume_from["kwargs"]
+        self._url = url
+        self._query_data = query_data
+        self._fields = tuple(fields) if fields else None
 
         # Preserve kwargs for subsequent queries
+        self._base_kwargs = kwargs.copy()
         self._kwargs = kwargs.copy()
-
-        self._query(url, query_data, **self._kwargs)
+        # Keyset queries restart from the base URL, so they need the initial
+        # parameters but never a page number
+        self._cursor_kwargs = {k: v for k, v in kwargs.items() if k != "page"}
+
+        if resume_from is not None:
+            self._query(
+                resume_from["page_url"],
+                resume_from["page_query_data"],
+                **resume_from["page_kwargs"],
+            )
+            self._current = resume_from["offset"]
+        else:
+            self._query(url, query_data, **self._kwargs)
         self._get_next = get_next
 
         # Remove query_parameters from kwargs, which are saved via the `next` URL
         self._kwargs.pop("query_parameters", None)
 
+    def checkpoint(self) -> Dict[str, Any]:
+        """Returns the current position in the list as a JSON-serializable dict,
+        to be passed as `resume_from` to continue the iteration later."""
+        # copied, so that neither the list nor the checkpoint changes the other
+        return copy.deepcopy(
+            {
+                "url": self._url,
+                "query_data": self._query_data,
+                "kwargs": self._base_kwargs,
+                "fields": list(self._fields) if self._fields else None,
+                "page_url": self._page_url,
+                "page_query_data": self._page_query_data,
+                "page_kwargs": self._page_kwargs,
+                "offset": self._current,
+                "max_retries": self._max_retries,
+            }
+        )
+
+    def _request_page(
+        self, url: str, query_data: Dict[str, Any], **kwargs: Any
+    ) -> requests.Response:
+        attempt = 0
+        while True:
+            try:
+                return self._openbas.http_request(
+                    "get", url, query_data=query_data, **kwargs
+                )
+            except (
+                exceptions.OpenBASHttpError,
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+            ) as e:
+                if attempt >= self._max_retries or (
+                    isinstance(e, exceptions.OpenBASHttpError)
+                    and e.response_code not in RETRYABLE_STATUS_CODES
+                ):
+                    raise
+                time.sleep(min(2**attempt, 30))
+                attempt += 1
+
     def _query(
         self, url: str, query_data: Optional[Dict[str, Any]] = None, **kwargs: Any
     ) -> None:
         query_data = query_data or {}
-        result = self._openbas.http_request("get", url, query_data=query_data, **kwargs)
+        result = self._request_page(url, query_data, **kwargs)
+        self._page_url = url
+        self._page_query_data = query_data
+        self._page_kwargs = kwargs
         try:
             next_url = result.links["next"]["url"]
         except KeyError:
             next_url = None
 
         self._next_url = next_url
+        self._next_cursor: Optional[str] = result.headers.get(NEXT_CURSOR_HEADER)
         self._current_page: Optional[str] = result.headers.get("X-Page")
         self._prev_page: Optional[str] = result.headers.get("X-Prev-Page")
         self._next_page: Optional[str] = result.headers.get("X-Next-Page")
@@ -518,14 +631,33 @@ class OpenBASList:
         self._total: Optional[str] = result.headers.get("X-Total")
 
         try:
-            self._data: List[Dict[str, Any]] = result.json()
+            self._data: List[Any] = result.json()
         except Exception as e:
             raise exceptions.OpenBASParsingError(
                 error_message="Failed to parse the server message"
             ) from e
 
+        if self._fields:
+            # Drop the unused keys right away so only the records stay in memory
+            record_cls = utils.record_type(self._fields)
+            self._data = [
+                record_cls(*map(item.get, self._fields)) for item in self._data
+            ]
+
         self._current = 0
 
+    def _query_next_cursor(self) -> None:
+        query_data = {**self._query_data, CURSOR_PARAMETER: self._next_cursor}
+        self._query(self._url, query_data, **self._cursor_kwargs)
+
+    @property
+    def next_cursor(self) -> Optional[str]:
+        """The cursor of the next page when keyset pagination is used.
+
+        If None, the server did not return a cursor for this page.
+        """
+        return self._next_cursor
+
     @property
     def current_page(self) -> int:
         """The current page number."""
@@ -568,6 +700,33 @@ class OpenBASList:
             return int(self._total)
         return None
 
+    def to_columns(self, fields: Sequence[str]) -> export.ColumnarBuffer:
+        """Loads the remaining items, page after page, into a columnar buffer
+        holding one typed array per field."""
+        return export.to_columns(self, fields)
+
+    def export(
+        self,
+        fields: Sequence[str],
+        *,
+        csv_file: Optional[IO[str]] = None,
+        jsonl_file: Optional[IO[str]] = None,
+        chunk_size: int = export.DEFAULT_CHUNK_SIZE,
+    ) -> int:
+        """Writes the remaining items to CSV and/or JSONL files, `chunk_size`
+        rows at a time, so memory stays bounded whatever the list size.
+
+        Returns:
+            The number of rows written
+        """
+        return export.write_chunks(
+            self,
+            fields,
+            csv_file=csv_file,
+            jsonl_file=jsonl_file,
+            chunk_size=chunk_size,
+        )
+
     def __iter__(self) -> "OpenBASList":
         return self
 
@@ -587,8 +746,12 @@ class OpenBASList:
         except IndexError:
             pass
 
-        if self._next_url and self._get_next is True:
-            self._query(self._next_url, **self._kwargs)
-            return self.next()
+        if self._get_next is True:
+            if self._next_cursor:
+                self._query_next_cursor()
+                return self.next()
+            if self._next_url:
+                self._query(self._next_url, **self._kwargs)
+                return self.next()
 
         raise StopIteration
@@ -15,8 +15,13 @@ class CollectorDaemon(BaseDaemon):
     `collector_period`: time to wait in seconds between each loop execution; note
     that this time is added to the time the loop takes to run, so the actual total
     time between each loop start is time_of_loop+period.
+
+    The callback may bring the next loop forward with schedule_next_poll(), e.g.
+    to run when the next pending expectation expires.
     """
 
+    _next_poll_at = None
+
     def _setup(self):
         if self._configuration.get("collector_period") is None:
             self._configuration.set("collector_period", DEFAULT_PERIOD_SECONDS)
@@ -55,12 +60,31 @@ class CollectorDaemon(BaseDaemon):
 
         PingAlive(self.api, config, self.logger, "collector").start()
 
+    def schedule_next_poll(self, timestamp):
+        """Runs the next loop at `timestamp` if it comes before the end of the
+        configured period. Only applies to the next loop.
+
+        :param timestamp: time at which to run the next loop, as returned by
+            time.time(); None is ignored
+        :type timestamp: float, optional
+        """
+        if timestamp is None:
+            return
+        if self._next_poll_at is None or timestamp < self._next_poll_at:
+            self._next_poll_at = timestamp
+
+    def _next_delay(self, delay):
+        next_poll_at, self._next_poll_at = self._next_poll_at, None
+        if next_poll_at is None:
+            return delay
+        return min(delay, max(next_poll_at - time.time(), 0))
+
     def _start_loop(self):
         scheduler = sched.scheduler(time.time, time.sleep)
         delay = self._configuration.get("collector_period")
         self._try_callback()
         scheduler.enter(
-            delay=delay,
+            delay=self._next_delay(delay),
             priority=1,
             action=self.__schedule,
             argument=(scheduler, self._try_callback, delay),
@@ -70,7 +94,7 @@ class CollectorDaemon(BaseDaemon):
     def __schedule(self, scheduler, callback, delay):
         callback()
         scheduler.enter(
-            delay=delay,
+            delay=self._next_delay(delay),
             priority=1,
             action=self.__schedule,
             argument=(scheduler, callback, delay),
@@ -0,0 +1,265 @@
+import array
+import csv
+import json
+from collections.abc import MutableSequence
+from typing import IO, Any, Dict, Iterable, List, Optional, Sequence
+
+__all__ = [
+    "Column",
+    "ColumnarBuffer",
+    "to_columns",
+    "write_chunks",
+]
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+# array typecodes used to store each kind of column
+_TYPECODES = {"bool": "b", "int": "q", "float": "d", "str": "q"}
+
+
+def _kind_of(value: Any) -> str:
+    # bool must be tested before int as it is a subclass of it
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    return "str"
+
+
+def _to_str(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, MutableSequence):
+        # e.g. the list attributes of REST objects
+        value = list(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True)
+    return str(value)
+
+
+class Column:
+    """A typed, append-only column.
+
+    Values are stored in a typed :class:`array.array` (``bool``, ``int`` or
+    ``float``). Strings, and any value that does not fit a numeric column, are
+    dictionary-encoded: the array holds integer codes into ``categories``.
+    Nested values (lists, dicts) are stored JSON-encoded. A ``validity``
+    bytearray marks which rows hold a value (1) or are null (0).
+
+    The column type is set by the first non-null value: ints are promoted to
+    floats when a float shows up, any other mismatch promotes the column to
+    strings.
+    """
+
+    __slots__ = ("name", "kind", "values", "validity", "categories", "_codes")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.kind: Optional[str] = None
+        self.values: array.array = array.array("q")
+        self.validity = bytearray()
+        self.categories: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.validity)
+
+    def _encode(self, value: Any) -> int:
+        value = _to_str(value)
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.categories)
+            self.categories.append(value)
+        return code
+
+    def _set_kind(self, kind: str) -> None:
+        self.kind = kind
+        # rows appended before the first value are all nulls
+        self.values = array.array(_TYPECODES[kind], [0]) * len(self.validity)
+
+    def _promote(self, kind: str) -> None:
+        previous_kind, previous = self.kind, self.values
+        self.kind = kind
+        self.values = array.array(_TYPECODES[kind])
+        for value, valid in zip(previous, self.validity):
+            if not valid:
+                self.values.append(0)
+            elif kind == "float":
+                self.values.append(float(value))
+            else:
+                self.values.append(
+                    self._encode(bool(value) if previous_kind == "bool" else value)
+                )
+
+    def append(self, value: Any) -> None:
+        if value is None:
+            self.validity.append(0)
+            if self.kind is not None:
+                self.values.append(0)
+            return
+
+        kind = _kind_of(value)
+        if self.kind is None:
+            self._set_kind(kind)
+        elif kind != self.kind and self.kind != "str":
+            if self.kind == "int" and kind == "float":
+                self._promote("float")
+            elif not (self.kind == "float" and kind == "int"):
+                self._promote("str")
+
+        if self.kind == "str":
+            value = self._encode(value)
+        elif self.kind == "float":
+            value = float(value)
+        try:
+            self.values.append(value)
+        except OverflowError:
+            # does not fit in a 64 bits integer
+            self._promote("str")
+            self.values.append(self._encode(value))
+        self.validity.append(1)
+
+    def get(self, index: int) -> Any:
+        """Returns the value stored at `index`, or None for a null."""
+        if not self.validity[index]:
+            return None
+        value = self.values[index]
+        if self.kind == "str":
+            return self.categories[value]
+        if self.kind == "bool":
+            return bool(value)
+        return value
+
+    def clear(self) -> None:
+        """Drops all the rows and the string dictionary, but keeps the column
+        type. The dictionary only holds the values of the rows kept, so a
+        high-cardinality column (e.g. ids) does not grow from chunk to chunk."""
+        del self.values[:]
+        self.validity.clear()
+        self.categories = []
+        self._codes = {}
+
+    def to_numpy(self) -> Any:
+        """Returns the column as a NumPy masked array, nulls being masked.
+
+        String columns are returned as their integer codes, to be looked up in
+        ``categories``. Requires NumPy to be installed.
+        """
+        try:
+            import numpy
+        except ImportError as e:
+            raise ImportError("NumPy is required to export columns as arrays") from e
+
+        dtype = {"bool": numpy.bool_, "float": numpy.float64}.get(
+            self.kind, numpy.int64
+        )
+        if self.kind is None:
+            data = numpy.zeros(len(self), dtype=dtype)
+        else:
+            data = numpy.frombuffer(self.values, dtype=self.values.typecode)
+            data = data.astype(dtype)
+        mask = numpy.frombuffer(bytes(self.validity), dtype=numpy.uint8) == 0
+        return numpy.ma.MaskedArray(data, mask=mask)
+
+
+class ColumnarBuffer:
+    """Stores rows as one :class:`Column` per field, without any per-row object.
+
+    Rows can be dicts, or any object exposing the fields as attributes (e.g. a
+    record returned by a projected list or a RESTObject).
+    """
+
+    def __init__(self, fields: Sequence[str]) -> None:
+        self.fields = tuple(fields)
+        self.columns: Dict[str, Column] = {field: Column(field) for field in fields}
+
+    def __len__(self) -> int:
+        return len(self.columns[self.fields[0]]) if self.fields else 0
+
+    def __getitem__(self, field: str) -> Column:
+        return self.columns[field]
+
+    def append(self, item: Any) -> None:
+        if isinstance(item, dict):
+            getter = item.get
+        else:
+            getter = lambda field: getattr(item, field, None)  # noqa: E731
+        for field in self.fields:
+            self.columns[field].append(getter(field))
+
+    def extend(self, items: Iterable[Any]) -> None:
+        for item in items:
+            self.append(item)
+
+    def clear(self) -> None:
+        for column in self.columns.values():
+            column.clear()
+
+    def rows(self) -> Iterable[List[Any]]:
+        """Yields the rows, one list of values at a time."""
+        columns = [self.columns[field] for field in self.fields]
+        for index in range(len(self)):
+            yield [column.get(index) for column in columns]
+
+    def write_csv(self, file: IO[str], header: bool = True) -> None:
+        writer = csv.writer(file)
+        if header:
+            writer.writerow(self.fields)
+        writer.writerows(self.rows())
+
+    def write_jsonl(self, file: IO[str]) -> None:
+        for row in self.rows():
+            file.write(json.dumps(dict(zip(self.fields, row))))
+            file.write("\n")
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """Returns a dict of NumPy masked arrays, one per field
+        (see :meth:`Column.to_numpy`)."""
+        return {field: column.to_numpy() for field, column in self.columns.items()}
+
+
+def to_columns(items: Iterable[Any], fields: Sequence[str]) -> ColumnarBuffer:
+    """Loads all the `items` into a new columnar buffer."""
+    buffer = ColumnarBuffer(fields)
+    buffer.extend(items)
+    return buffer
+
+
+def write_chunks(
+    items: Iterable[Any],
+    fields: Sequence[str],
+    *,
+    csv_file: Optional[IO[str]] = None,
+    jsonl_file: Optional[IO[str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """Streams `items` to CSV and/or JSONL files through a columnar buffer that
+    is flushed every `chunk_size` rows, so memory stays bounded whatever the
+    number of items.
+
+    :return: the number of rows written
+    :rtype: int
+    """
+    buffer = ColumnarBuffer(fields)
+    written = 0
+    header = True
+
+    def flush() -> None:
+        nonlocal header, written
+        if csv_file is not None:
+            buffer.write_csv(csv_file, header=header)
+        if jsonl_file is not None:
+            buffer.write_jsonl(jsonl_file)
+        header = False
+        written += len(buffer)
+        buffer.clear()
+
+    for item in items:
+        buffer.append(item)
+        if len(buffer) >= chunk_size:
+            flush()
+    if len(buffer) or header:
+        flush()
+    return written
@@ -12,15 +12,19 @@ import traceback
 from typing import Callable, Dict, List
 
 import pika
-from thefuzz import fuzz
 
 from pyobas import OpenBAS, utils
 from pyobas.configuration import Configuration
 from pyobas.daemons import CollectorDaemon
 from pyobas.exceptions import ConfigurationError
+from pyobas.signatures import fuzzy, ip
+from pyobas.signatures.aho_corasick import automaton_for
+from pyobas.signatures.regex import compile_pattern
 
 TRUTHY: List[str] = ["yes", "true", "True"]
 FALSY: List[str] = ["no", "false", "False"]
+# Bounds the normalization caches of OpenBASDetectionHelper between cycles
+NORMALIZATION_CACHE_SIZE = 100_000
 
 
 # As cert must be written in files to be loaded in ssl context
@@ -356,21 +360,80 @@ class OpenBASInjectorHelper:
 
 
 class OpenBASDetectionHelper:
-    def __init__(self, logger, relevant_signatures_types) -> None:
+    def __init__(self, logger, relevant_signatures_types, seen_alerts=None) -> None:
         self.logger = logger
         self.relevant_signatures_types = relevant_signatures_types
+        # optional SeenAlertFilter to skip the alerts processed in earlier cycles
+        self.seen_alerts = seen_alerts
+        # Normalized values, computed once per unique value until new_cycle()
+        self._normalized_signatures: Dict[str, str] = {}
+        self._normalized_alert_values: Dict[str, str] = {}
+
+    def new_cycle(self) -> None:
+        """Forgets the values normalized so far, e.g. at the start of each
+        collection cycle, so the caches only hold the current values."""
+        self._normalized_signatures.clear()
+        self._normalized_alert_values.clear()
+
+    def is_new_alert(self, alert_id) -> bool:
+        """Tells whether an alert was not processed yet, and remembers it as
+        processed. Always True without a seen alerts filter."""
+        if self.seen_alerts is None:
+            return True
+        return not self.seen_alerts.check_and_add(alert_id)
+
+    def _normalize_signature_value(self, signature_value):
+        cache = self._normalized_signatures
+        if (normalized := cache.get(signature_value)) is None:
+            if len(cache) >= NORMALIZATION_CACHE_SIZE:
+                cache.clear()
+            normalized = self._decode_value(signature_value).strip().lower()
+            cache[signature_value] = normalized
+        return normalized
+
+    def _normalize_alert_values(self, alert_values):
+        cache = self._normalized_alert_values
+        if len(cache) >= NORMALIZATION_CACHE_SIZE:
+            cache.clear()
+        normalized_values = []
+        for value in alert_values:
+            if (normalized := cache.get(value)) is None:
+                normalized = cache[value] = value.strip().lower()
+            normalized_values.append(normalized)
+        return normalized_values
 
     def match_alert_element_fuzzy(self, signature_value, alert_values, fuzzy_scoring):
-        for alert_value in alert_values:
-            self.logger.info(
-                "Comparing alert value (" + alert_value + ", " + signature_value + ")"
-            )
-            ratio = fuzz.ratio(alert_value, signature_value)
-            if ratio > fuzzy_scoring:
-                self.logger.info("MATCHING! (score: " + str(ratio) + ")")
-                return True
+        self.logger.info(
+            "Comparing alert values ("
+            + ", ".join(alert_values)
+            + ") with "
+            + signature_value
+        )
+        best_match = fuzzy.match_any(
+            alert_values, signature_value, fuzzy_scoring, strict=True
+        )
+        if best_match is not None:
+            self.logger.info("MATCHING! (score: " + str(best_match[1]) + ")")
+            return True
         return False
 
+    def match_alert_elements_fuzzy_batch(
+        self, signature_values, alert_values, fuzzy_scoring, workers=1
+    ):
+        """Scores all the alert values against all the signature values at once.
+
+        :return: for each alert value, the index and score of the best matching
+            signature value, or None
+        :rtype: list[tuple[int, int] | None]
+        """
+        return fuzzy.best_matches(
+            alert_values,
+            signature_values,
+            fuzzy_scoring,
+            strict=True,
+            workers=workers,
+        )
+
     def match_alert_elements(self, signatures, alert_data):
         return self._match_alert_elements_original(
             signatures, alert_data
@@ -399,6 +462,18 @@ class OpenBASDetectionHelper:
                 signature_result = signature["value"] in str(
                     alert_data_for_signature["data"]
                 )
+            elif alert_data_for_signature["type"] == "substring":
+                signature_result = self.match_alert_element_substring(
+                    signature["value"], alert_data_for_signature["data"]
+                )
+            elif alert_data_for_signature["type"] == "regex":
+                signature_result = self.match_alert_element_regex(
+                    signature["value"], alert_data_for_signature["data"]
+                )
+            elif alert_data_for_signature["type"] == "ip":
+                signature_result = self.match_alert_element_ip(
+                    signature["value"], alert_data_for_signature["data"]
+                )
 
             if signature_result:
                 matching_number = matching_number + 1
@@ -416,18 +491,51 @@ class OpenBASDetectionHelper:
         if len(command_line_signatures) == 0:
             return False
         key_types = ["command_line", "process_name", "file_name"]
-        alert_datas = [alert_data.get(key) for key in key_types if key in alert_data]
-        for signature in command_line_signatures:
-            signature_result = False
-            signature_value = self._decode_value(signature["value"]).strip().lower()
-            for alert_data in alert_datas:
-                trimmed_lowered_datas = [s.strip().lower() for s in alert_data["data"]]
-                signature_result = any(
-                    data in signature_value for data in trimmed_lowered_datas
-                )
-            if signature_result:
-                return True
-        return False
+        # a signature matches if it contains any value of any of these types
+        automaton = self._automaton_for(
+            [
+                value
+                for key in key_types
+                if key in alert_data
+                for value in self._normalize_alert_values(alert_data[key]["data"])
+            ]
+        )
+        return any(
+            automaton.search_any(self._normalize_signature_value(signature["value"]))
+            for signature in command_line_signatures
+        )
+
+    def match_alert_element_substring(self, signature_value, alert_values):
+        """Whether the signature value contains any of the alert values, ignoring
+        case and surrounding whitespace."""
+        if isinstance(alert_values, str):
+            alert_values = [alert_values]
+        return self._automaton_for(
+            self._normalize_alert_values(alert_values)
+        ).search_any(signature_value.strip().lower())
+
+    def match_alert_element_regex(self, signature_value, alert_values):
+        """Whether the signature regular expression is found in any of the
+        alert values. Invalid expressions never match."""
+        if isinstance(alert_values, str):
+            alert_values = [alert_values]
+        if (pattern := compile_pattern(signature_value)) is None:
+            self.logger.info("Invalid regex signature: " + signature_value)
+            return False
+        return any(pattern.search(value) for value in alert_values)
+
+    def match_alert_element_ip(self, signature_value, alert_values):
+        """Whether any of the alert IP addresses is within the signature IP
+        address or CIDR range."""
+        if isinstance(alert_values, str):
+            alert_values = [alert_values]
+        return ip.any_within(alert_values, signature_value)
+
+    @staticmethod
+    def _automaton_for(patterns):
+        # the same alert values are searched in many signatures: automatons
+        # are shared through a bounded LRU cache
+        return automaton_for(tuple(patterns))
 
     def _decode_value(self, signature_value):
         if _is_base64_encoded(signature_value):
@@ -441,9 +549,11 @@ class OpenBASDetectionHelper:
             return signature_value
 
 
+_BASE64_PATTERN = re.compile(r"^[A-Za-z0-9+/]*={0,2}$")
+
+
 def _is_base64_encoded(str_maybe_base64):
     # Check if the length is a multiple of 4 and matches the Base64 character set
-    base64_pattern = re.compile(r"^[A-Za-z0-9+/]*={0,2}$")
     return len(str_maybe_base64) % 4 == 0 and bool(
-        base64_pattern.match(str_maybe_base64)
+        _BASE64_PATTERN.match(str_maybe_base64)
     )
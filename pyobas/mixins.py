@@ -1,4 +1,6 @@
 import enum
+import json
+import threading
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -6,17 +8,20 @@ from typing import (
     Dict,
     List,
     Optional,
+    Sequence,
     Tuple,
     Type,
     Union,
 )
 
+import cachetools
 import requests
 
 import pyobas
 from pyobas import base
 from pyobas import exceptions as exc
 from pyobas import utils
+from pyobas.client import OpenBASList
 
 __all__ = [
     "GetMixin",
@@ -33,6 +38,9 @@ else:
 
 
 class HeadMixin(_RestManagerBase):
+    # How long, in seconds, the results of count() and exists() are cached
+    _head_cache_ttl: float = 5.0
+
     @exc.on_http_error(exc.OpenBASHeadError)
     def head(
         self, id: Optional[Union[str, int]] = None, **kwargs: Any
@@ -46,6 +54,22 @@ class HeadMixin(_RestManagerBase):
 
         return self.openbas.http_head(path, **kwargs)
 
+    def _cached_head_query(self, key: str, query: Callable[[], Any]) -> Any:
+        """Returns the cached result for `key`, running `query` on a miss."""
+        if "_head_cache" not in self.__dict__:
+            self.__dict__["_head_cache"] = cachetools.TTLCache(
+                maxsize=1024, ttl=self._head_cache_ttl
+            )
+            self.__dict__["_head_cache_lock"] = threading.Lock()
+        cache, lock = self.__dict__["_head_cache"], self.__dict__["_head_cache_lock"]
+        with lock:
+            if key in cache:
+                return cache[key]
+        result = query()
+        with lock:
+            cache[key] = result
+        return result
+
 
 class GetMixin(HeadMixin, _RestManagerBase):
     _computed_path: Optional[str]
@@ -55,19 +79,68 @@ class GetMixin(HeadMixin, _RestManagerBase):
     _parent: Optional[base.RESTObject]
     _parent_attrs: Dict[str, Any]
     _path: Optional[str]
+    _projection_param: Optional[str] = None
     openbas: pyobas.OpenBAS
 
     @exc.on_http_error(exc.OpenBASGetError)
-    def get(self, id: Union[str, int], **kwargs: Any) -> base.RESTObject:
+    def get(
+        self,
+        id: Union[str, int],
+        *,
+        fields: Optional[Sequence[str]] = None,
+        **kwargs: Any,
+    ) -> Union[base.RESTObject, Tuple[Any, ...]]:
+        """Retrieve a single object.
+
+        Args:
+            id: ID of the object to retrieve
+            fields: If set, only keep these fields and return them as a
+                compact record instead of a RESTObject
+            **kwargs: Extra options to send to the server
+
+        Returns:
+            The generated RESTObject, or a record if `fields` is set
+        """
         if isinstance(id, str):
             id = utils.EncodedId(id)
         path = f"{self.path}/{id}"
         if TYPE_CHECKING:
             assert self._obj_cls is not None
+        if fields and self._projection_param:
+            query_data = kwargs.pop("query_data", None) or {}
+            query_data.setdefault(self._projection_param, ",".join(fields))
+            kwargs["query_data"] = query_data
         server_data = self.openbas.http_get(path, **kwargs)
         if TYPE_CHECKING:
             assert not isinstance(server_data, requests.Response)
-        return self._obj_cls(self, server_data)
+        if fields:
+            return utils.project(server_data, fields)
+        return self._build_object(server_data)
+
+    @exc.on_http_error(exc.OpenBASGetError)
+    def exists(self, id: Union[str, int], **kwargs: Any) -> bool:
+        """Check whether an object exists with a HEAD request, without
+        downloading it. Results are cached for ``_head_cache_ttl`` seconds.
+
+        Args:
+            id: ID of the object to look for
+            **kwargs: Extra options to send to the server
+
+        Returns:
+            False if the server answers 404, True otherwise
+        """
+
+        def query() -> bool:
+            try:
+                self.openbas.http_head(f"{self.path}/{utils.EncodedId(id)}", **kwargs)
+            except exc.OpenBASHttpError as e:
+                if e.response_code == 404:
+                    return False
+                raise
+            return True
+
+        key = json.dumps(["exists", id, kwargs], sort_keys=True, default=str)
+        return self._cached_head_query(key, query)
 
 
 class GetWithoutIdMixin(HeadMixin, _RestManagerBase):
@@ -88,7 +161,7 @@ class GetWithoutIdMixin(HeadMixin, _RestManagerBase):
         if TYPE_CHECKING:
             assert not isinstance(server_data, requests.Response)
             assert self._obj_cls is not None
-        return self._obj_cls(self, server_data)
+        return self._build_object(server_data)
 
 
 class ListMixin(HeadMixin, _RestManagerBase):
@@ -99,10 +172,46 @@ class ListMixin(HeadMixin, _RestManagerBase):
     _parent: Optional[base.RESTObject]
     _parent_attrs: Dict[str, Any]
     _path: Optional[str]
+    _projection_param: Optional[str] = None
     openbas: pyobas.OpenBAS
 
     @exc.on_http_error(exc.OpenBASListError)
-    def list(self, **kwargs: Any) -> Union[base.RESTObjectList, List[base.RESTObject]]:
+    def list(
+        self,
+        *,
+        raw: bool = False,
+        fields: Optional[Sequence[str]] = None,
+        resume_from: Optional[Dict[str, Any]] = None,
+        compact: bool = False,
+        **kwargs: Any,
+    ) -> Union[
+        base.RESTObjectList,
+        List[base.RESTObject],
+        OpenBASList,
+        List[Dict[str, Any]],
+        List[Tuple[Any, ...]],
+    ]:
+        """Retrieve a list of objects.
+
+        Args:
+            raw: If True, yield the decoded dicts as returned by the server
+                instead of building a RESTObject for each item
+            fields: If set, only keep these fields and yield them as compact
+                records. The projection is requested from the server when
+                the manager defines ``_projection_param``, and is applied
+                while decoding each page otherwise.
+            resume_from: A checkpoint returned by
+                :meth:`pyobas.client.OpenBASList.checkpoint`. The iteration
+                continues from there and a generator is always returned.
+            compact: If True, build read-only
+                :class:`pyobas.base.CompactRESTObject` items, which use a lot
+                less memory than regular RESTObjects
+            **kwargs: Extra options to send to the server (e.g. iterator,
+                per_page, page)
+
+        Returns:
+            The list of objects, or a generator if `iterator` is True
+        """
 
         if self.openbas.per_page:
             kwargs.setdefault("per_page", self.openbas.per_page)
@@ -114,15 +223,86 @@ class ListMixin(HeadMixin, _RestManagerBase):
         if self.openbas.order_by:
             kwargs.setdefault("order_by", self.openbas.order_by)
 
+        if TYPE_CHECKING:
+            assert self._obj_cls is not None
+
+        # keyset pagination needs a stable sort key to build its cursor
+        if kwargs.get("pagination") == "keyset" and self._obj_cls._id_attr:
+            kwargs.setdefault("order_by", self._obj_cls._id_attr)
+
         # Allow to overwrite the path, handy for custom listings
         path = kwargs.pop("path", self.path)
 
-        if TYPE_CHECKING:
-            assert self._obj_cls is not None
+        if resume_from is not None:
+            kwargs["resume_from"] = resume_from
+            fields = resume_from["fields"]
+
+        if fields:
+            if self._projection_param:
+                query_data = kwargs.pop("query_data", None) or {}
+                query_data.setdefault(self._projection_param, ",".join(fields))
+                kwargs["query_data"] = query_data
+            return self.openbas.http_list(path, fields=fields, **kwargs)
+
         obj = self.openbas.http_list(path, **kwargs)
+        if raw:
+            return obj
+        obj_cls = self._obj_cls._get_compact_cls() if compact else self._obj_cls
         if isinstance(obj, list):
-            return [self._obj_cls(self, item, created_from_list=True) for item in obj]
-        return base.RESTObjectList(self, self._obj_cls, obj)
+            return [
+                self._build_object(item, obj_cls=obj_cls, created_from_list=True)
+                for item in obj
+            ]
+        return base.RESTObjectList(self, obj_cls, obj)
+
+    @exc.on_http_error(exc.OpenBASListError)
+    def count(self, **filters: Any) -> Optional[int]:
+        """Return the total number of objects matching `filters`, read from the
+        X-Total header. Results are cached for ``_head_cache_ttl`` seconds.
+
+        A HEAD request is used when the endpoint supports it. Otherwise a
+        single-item page is requested and only its headers are read: the body
+        is never downloaded nor decoded.
+
+        Args:
+            **filters: Filters to send to the server
+
+        Returns:
+            The number of objects, or None if the server does not report it
+        """
+        path = filters.pop("path", self.path)
+        filters["per_page"] = 1
+
+        def query() -> Optional[int]:
+            try:
+                headers = self.openbas.http_head(path, **filters)
+            except exc.OpenBASHttpError as e:
+                if e.response_code not in (405, 501):
+                    raise
+                headers = {}
+            total = headers.get("X-Total")
+            if total is None:
+                response = self.openbas.http_request(
+                    "get", path, streamed=True, **filters
+                )
+                total = response.headers.get("X-Total")
+                response.close()
+            return int(total) if total is not None else None
+
+        key = json.dumps(["count", path, filters], sort_keys=True, default=str)
+        return self._cached_head_query(key, query)
+
+    def iter_raw(self, **kwargs: Any) -> OpenBASList:
+        """Iterate over all the objects as plain dicts, fetching pages lazily.
+
+        This skips the RESTObject construction entirely, which makes it the
+        cheapest way to export large collections.
+        """
+        kwargs["iterator"] = True
+        result = self.list(raw=True, **kwargs)
+        if TYPE_CHECKING:
+            assert isinstance(result, OpenBASList)
+        return result
 
 
 @enum.unique
@@ -215,4 +395,4 @@ class CreateMixin(_RestManagerBase):
         if TYPE_CHECKING:
             assert not isinstance(server_data, requests.Response)
             assert self._obj_cls is not None
-        return self._obj_cls(self, server_data)
+        return self._build_object(server_data)
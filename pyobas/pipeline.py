@@ -0,0 +1,517 @@
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from pyobas.apis.inject_expectation.matcher import ExpectationMatcher
+from pyobas.apis.inject_expectation.store import ExpectationStore
+from pyobas.signatures.planner import MatchPlanner
+from pyobas.signatures.signature_type import SignatureType
+
+__all__ = [
+    "Alert",
+    "Match",
+    "StageMetrics",
+    "Stage",
+    "FunctionStage",
+    "SkipSeenStage",
+    "NormalizeStage",
+    "MatchStage",
+    "ResultSink",
+    "TraceSink",
+    "Pipeline",
+]
+
+DEFAULT_QUEUE_SIZE = 1_000
+DEFAULT_TRACES_BATCH_SIZE = 500
+
+# marks the end of the stream in the queues between threaded stages
+_END = object()
+
+
+class Alert(NamedTuple):
+    """An alert from the security software and the signature structs built
+    for it, as expected by Expectation.match_alert."""
+
+    alert: Any
+    alert_data: Dict[str, Dict[str, Any]]
+
+
+class Match(NamedTuple):
+    """An alert matching an expectation."""
+
+    alert: Any
+    alert_data: Dict[str, Dict[str, Any]]
+    expectation: Any
+
+
+class StageMetrics:
+    """Counters of a stage for the last run of a pipeline."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.reset()
+
+    def reset(self) -> None:
+        self.received = 0
+        self.emitted = 0
+        self.errors = 0
+        # time spent in the stage itself, without waiting for other stages
+        self.busy_seconds = 0.0
+        self.started_at: Optional[float] = None
+        self.ended_at: Optional[float] = None
+
+    @property
+    def elapsed_seconds(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.ended_at or time.monotonic()) - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Items received per second of wall-clock time."""
+        elapsed = self.elapsed_seconds
+        return self.received / elapsed if elapsed else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "received": self.received,
+            "emitted": self.emitted,
+            "errors": self.errors,
+            "busy_seconds": self.busy_seconds,
+            "elapsed_seconds": self.elapsed_seconds,
+            "throughput": self.throughput,
+        }
+
+
+class Stage:
+    """A step of a pipeline. Subclasses implement process(), which yields zero,
+    one or more items for each item received, and optionally flush(), which
+    yields the items still held when the stream ends (e.g. batches).
+
+    An error raised while processing an item is counted, logged and the item
+    is skipped, so that a single bad alert does not stop a collector.
+
+    :param name: name of the stage in the metrics, defaults to the class name
+    :type name: str, optional
+    """
+
+    def __init__(self, name: Optional[str] = None) -> None:
+        self.name = name or type(self).__name__
+        self.metrics = StageMetrics(self.name)
+        self.logger = None
+
+    def open(self) -> None:
+        """Called at the start of each run."""
+
+    def process(self, item: Any) -> Iterable[Any]:
+        yield item
+
+    def flush(self) -> Iterable[Any]:
+        return ()
+
+    def _process(self, item: Any) -> List[Any]:
+        self.metrics.received += 1
+        start = time.monotonic()
+        try:
+            outputs = list(self.process(item))
+        except Exception as err:  # pylint: disable=broad-except
+            self.metrics.errors += 1
+            if self.logger is not None:
+                self.logger.error(f"Error in pipeline stage {self.name}: {err}")
+            outputs = []
+        self.metrics.busy_seconds += time.monotonic() - start
+        self.metrics.emitted += len(outputs)
+        return outputs
+
+    def _flush(self) -> List[Any]:
+        start = time.monotonic()
+        outputs = list(self.flush())
+        self.metrics.busy_seconds += time.monotonic() - start
+        self.metrics.emitted += len(outputs)
+        return outputs
+
+    def stream(self, items: Iterable[Any]) -> Iterator[Any]:
+        """Lazily applies the stage to a stream of items."""
+        self.metrics.started_at = time.monotonic()
+        for item in items:
+            yield from self._process(item)
+        yield from self._flush()
+        self.metrics.ended_at = time.monotonic()
+
+
+class FunctionStage(Stage):
+    """A stage applying a function to each item. The function returns the
+    output item, or None to drop the item."""
+
+    def __init__(self, function: Callable[[Any], Any], name: Optional[str] = None):
+        super().__init__(name or getattr(function, "__name__", None))
+        self.function = function
+
+    def process(self, item: Any) -> Iterable[Any]:
+        if (output := self.function(item)) is not None:
+            yield output
+
+
+class SkipSeenStage(Stage):
+    """Drops the alerts already processed in earlier runs, remembered in a
+    SeenAlertFilter, which is saved at the end of each run when it has a file.
+
+    :param seen_alerts: the alerts already processed
+    :type seen_alerts: SeenAlertFilter
+    :param key: returns the identifier of an alert
+    :type key: callable
+    """
+
+    def __init__(
+        self,
+        seen_alerts: Any,
+        key: Callable[[Any], Any],
+        name: Optional[str] = None,
+    ) -> None:
+        super().__init__(name)
+        self.seen_alerts = seen_alerts
+        self.key = key
+
+    def process(self, item: Any) -> Iterable[Any]:
+        if not self.seen_alerts.check_and_add(self.key(item)):
+            yield item
+
+    def flush(self) -> Iterable[Any]:
+        if self.seen_alerts.path is not None:
+            self.seen_alerts.save()
+        return ()
+
+
+class NormalizeStage(Stage):
+    """Builds the signature structs of each alert.
+
+    :param signature_types: the signature types to extract from the alerts
+    :type signature_types: list[SignatureType]
+    :param extract: returns the data found in an alert for a signature type,
+        or None when there is none
+    :type extract: callable(alert, SignatureType)
+    """
+
+    def __init__(
+        self,
+        signature_types: Sequence[SignatureType],
+        extract: Callable[[Any, SignatureType], Any],
+        name: Optional[str] = None,
+    ) -> None:
+        super().__init__(name)
+        self.signature_types = list(signature_types)
+        self.extract = extract
+
+    def process(self, item: Any) -> Iterable[Alert]:
+        alert_data = {}
+        for signature_type in self.signature_types:
+            if (data := self.extract(item, signature_type)) is not None:
+                alert_data[signature_type.label.value] = (
+                    signature_type.make_struct_for_matching(data)
+                )
+        if alert_data:
+            yield Alert(item, alert_data)
+
+
+class MatchStage(Stage):
+    """Matches each alert against the expectations, with an ExpectationMatcher
+    built at the start of a run.
+
+    With an ExpectationStore, each run syncs the store and the matcher is
+    only rebuilt when the sync changed the pending expectations: runs that
+    find nothing new reuse the matcher of the previous run. With a callable,
+    the matcher is rebuilt from its result at every run.
+
+    :param expectations: the store of the expectations to match, or a
+        callable returning them
+    :type expectations: ExpectationStore | callable
+    :param relevant_signature_types: signature types to consider, as for
+        Expectation.match_alert
+    :type relevant_signature_types: list[SignatureType]
+    :param planner: orders the signature checks, and keeps learning from one
+        run to the next
+    :type planner: MatchPlanner, optional
+    """
+
+    def __init__(
+        self,
+        expectations: Union[ExpectationStore, Callable[[], Iterable[Any]]],
+        relevant_signature_types: List[SignatureType],
+        planner: Optional[MatchPlanner] = None,
+        name: Optional[str] = None,
+    ) -> None:
+        super().__init__(name)
+        self.expectations = expectations
+        self.relevant_signature_types = relevant_signature_types
+        self.planner = planner
+        self.matcher: Optional[ExpectationMatcher] = None
+
+    def open(self) -> None:
+        if self.planner is not None:
+            self.planner.new_cycle()
+        if isinstance(self.expectations, ExpectationStore):
+            if not self.expectations.sync() and self.matcher is not None:
+                return
+            expectations = self.expectations.expectations
+        else:
+            expectations = self.expectations()
+        self.matcher = ExpectationMatcher(
+            expectations, self.relevant_signature_types, self.planner
+        )
+
+    def process(self, item: Alert) -> Iterable[Match]:
+        for expectation in self.matcher.match(item.alert_data):
+            yield Match(item.alert, item.alert_data, expectation)
+
+
+class ResultSink(Stage):
+    """Reports each matched expectation as successful, once per run, then
+    passes the matches on (e.g. to a TraceSink).
+
+    :param sender_id: identifier of the collector updating the expectations
+    :type sender_id: str
+    :param metadata: returns the metadata of the update for a match
+    :type metadata: callable, optional
+    """
+
+    def __init__(
+        self,
+        sender_id: str,
+        metadata: Optional[Callable[[Match], Dict[str, Any]]] = None,
+        name: Optional[str] = None,
+    ) -> None:
+        super().__init__(name)
+        self.sender_id = sender_id
+        self.metadata = metadata
+        self._updated: set = set()
+
+    def open(self) -> None:
+        self._updated = set()
+
+    def process(self, item: Match) -> Iterable[Match]:
+        inject_expectation_id = item.expectation.inject_expectation_id
+        if inject_expectation_id not in self._updated:
+            item.expectation.update(
+                success=True,
+                sender_id=self.sender_id,
+                metadata=self.metadata(item) if self.metadata else {},
+            )
+            self._updated.add(inject_expectation_id)
+        yield item
+
+
+class TraceSink(Stage):
+    """Posts an expectation trace for each match, in batches.
+
+    :param api: the OpenBAS client
+    :type api: OpenBAS
+    :param source_id: identifier of the collector posting the traces
+    :type source_id: str
+    :param alert_name: returns the name of the alert of a match
+    :type alert_name: callable
+    :param alert_link: returns the link to the alert of a match
+    :type alert_link: callable
+    :param batch_size: number of traces posted at once
+    :type batch_size: int
+    """
+
+    def __init__(
+        self,
+        api: Any,
+        source_id: str,
+        alert_name: Callable[[Match], str],
+        alert_link: Callable[[Match], str],
+        batch_size: int = DEFAULT_TRACES_BATCH_SIZE,
+        name: Optional[str] = None,
+    ) -> None:
+        super().__init__(name)
+        self.api = api
+        self.source_id = source_id
+        self.alert_name = alert_name
+        self.alert_link = alert_link
+        self.batch_size = batch_size
+        self._traces: List[Dict[str, Any]] = []
+
+    def open(self) -> None:
+        self._traces = []
+
+    def process(self, item: Match) -> Iterable[Match]:
+        self._traces.append(
+            {
+                "inject_expectation_trace_expectation": str(
+                    item.expectation.inject_expectation_id
+                ),
+                "inject_expectation_trace_source_id": self.source_id,
+                "inject_expectation_trace_alert_name": self.alert_name(item),
+                "inject_expectation_trace_alert_link": self.alert_link(item),
+                "inject_expectation_trace_date": datetime.now(timezone.utc).isoformat(),
+            }
+        )
+        if len(self._traces) >= self.batch_size:
+            self._post()
+        yield item
+
+    def flush(self) -> Iterable[Any]:
+        if self._traces:
+            self._post()
+        return ()
+
+    def _post(self) -> None:
+        traces, self._traces = self._traces, []
+        self.api.inject_expectation_trace.bulk_create(
+            payload={"expectation_traces": traces}
+        )
+
+
+class Pipeline:
+    """Streams the items of a source through a chain of stages, typically
+    alerts through NormalizeStage, MatchStage, ResultSink and TraceSink.
+
+    By default the stages are chained generators running in the calling
+    thread. With `threaded`, each stage runs in its own worker thread and
+    stages are connected by bounded queues: a slow stage blocks the ones
+    upstream instead of letting items pile up in memory.
+
+    :param source: returns the items of a run, e.g. fetches the alerts
+    :type source: callable
+    :param stages: the stages, in order
+    :type stages: list[Stage]
+    :param threaded: run each stage in its own thread
+    :type threaded: bool
+    :param queue_size: capacity of the queues between threaded stages
+    :type queue_size: int
+    :param logger: logger for the stage errors and the run metrics
+    :type logger: Any, optional
+    """
+
+    def __init__(
+        self,
+        source: Callable[[], Iterable[Any]],
+        stages: Sequence[Stage],
+        threaded: bool = False,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        logger=None,
+    ) -> None:
+        self.source = source
+        self.stages = list(stages)
+        self.threaded = threaded
+        self.queue_size = queue_size
+        self.logger = logger
+        self.source_metrics = StageMetrics("source")
+
+    @property
+    def metrics(self) -> List[StageMetrics]:
+        return [self.source_metrics] + [stage.metrics for stage in self.stages]
+
+    def _source_stream(self) -> Iterator[Any]:
+        self.source_metrics.started_at = time.monotonic()
+        for item in self.source():
+            self.source_metrics.received += 1
+            self.source_metrics.emitted += 1
+            yield item
+        self.source_metrics.ended_at = time.monotonic()
+
+    def run(self) -> int:
+        """Runs the pipeline over the whole source.
+
+        :return: the number of items out of the last stage
+        :rtype: int
+        """
+        for metrics in self.metrics:
+            metrics.reset()
+        for stage in self.stages:
+            stage.logger = self.logger
+            stage.open()
+        count = self._run_threaded() if self.threaded else self._run_inline()
+        if self.logger is not None:
+            for metrics in self.metrics:
+                self.logger.info("Pipeline stage metrics", metrics.as_dict())
+        return count
+
+    def _run_inline(self) -> int:
+        items = self._source_stream()
+        for stage in self.stages:
+            items = stage.stream(items)
+        return sum(1 for _ in items)
+
+    def _run_threaded(self) -> int:
+        errors: List[BaseException] = []
+        queues = [
+            queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)
+        ]
+
+        # indexes of the queues read up to the end of the stream
+        ended = set()
+
+        def consume(index: int) -> Iterator[Any]:
+            while (item := queues[index].get()) is not _END:
+                yield item
+            ended.add(index)
+
+        def feed(
+            items: Iterable[Any], output: queue.Queue, input_index: Optional[int]
+        ) -> None:
+            try:
+                for item in items:
+                    output.put(item)
+            except BaseException as err:  # pylint: disable=broad-except
+                errors.append(err)
+                if input_index is not None and input_index not in ended:
+                    # keep reading so that the previous stages are not blocked
+                    for _ in consume(input_index):
+                        pass
+            finally:
+                # always end the stream so that the next stages terminate
+                output.put(_END)
+
+        threads = [
+            threading.Thread(
+                target=feed,
+                args=(self._source_stream(), queues[0], None),
+                name="pipeline-source",
+                daemon=True,
+            )
+        ]
+        for index, stage in enumerate(self.stages):
+            threads.append(
+                threading.Thread(
+                    target=feed,
+                    args=(stage.stream(consume(index)), queues[index + 1], index),
+                    name=f"pipeline-{stage.name}",
+                    daemon=True,
+                )
+            )
+        for thread in threads:
+            thread.start()
+        count = sum(1 for _ in consume(len(self.stages)))
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        return count
+
+    def as_callback(self) -> Callable[..., None]:
+        """Returns a function running the pipeline, to be used as the callback
+        of a CollectorDaemon. The pipeline logs with the collector logger when
+        it has no logger of its own."""
+
+        def run_pipeline(collector):
+            if self.logger is None:
+                self.logger = collector.logger
+            self.run()
+
+        return run_pipeline
@@ -0,0 +1,220 @@
+import hashlib
+import logging
+import math
+import os
+import struct
+import tempfile
+import time
+from typing import Callable, Optional, Union
+
+__all__ = ["BloomFilter", "SeenAlertFilter"]
+
+DEFAULT_CAPACITY = 100_000
+DEFAULT_ERROR_RATE = 0.001
+DEFAULT_ROTATION_SECONDS = 24 * 3600
+
+_logger = logging.getLogger(__name__)
+
+Key = Union[str, bytes, int]
+
+
+def _to_bytes(key: Key) -> bytes:
+    if isinstance(key, bytes):
+        return key
+    # other keys (e.g. integer ids) are identified by their string form
+    return str(key).encode("utf-8")
+
+
+class BloomFilter:
+    """A fixed-size Bloom filter: tells whether a key was added, with no false
+    negatives and a false positive rate close to `error_rate` as long as no
+    more than `capacity` keys are added.
+
+    :param capacity: number of keys the filter is sized for
+    :type capacity: int
+    :param error_rate: target false positive rate, between 0 and 1
+    :type error_rate: float
+    """
+
+    _HEADER = struct.Struct("<QQQ")
+
+    def __init__(
+        self, capacity: int = DEFAULT_CAPACITY, error_rate: float = DEFAULT_ERROR_RATE
+    ) -> None:
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be positive and error_rate in ]0, 1[")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def __len__(self) -> int:
+        """Number of keys added, duplicates included."""
+        return self.count
+
+    def _positions(self, key: Key):
+        digest = hashlib.blake2b(_to_bytes(key), digest_size=16).digest()
+        first, second = struct.unpack("<QQ", digest)
+        # double hashing: k positions out of two hashes
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, key: Key) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: Key) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+    def to_bytes(self) -> bytes:
+        return self._HEADER.pack(self.size, self.hash_count, self.count) + bytes(
+            self._bits
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes, capacity: int, error_rate: float) -> "BloomFilter":
+        bloom_filter = cls(capacity, error_rate)
+        size, hash_count, count = cls._HEADER.unpack_from(data)
+        if (size, hash_count) != (bloom_filter.size, bloom_filter.hash_count):
+            raise ValueError("the filter was saved with another capacity or rate")
+        bits = data[cls._HEADER.size :]
+        if len(bits) != len(bloom_filter._bits):
+            raise ValueError("truncated filter data")
+        bloom_filter._bits[:] = bits
+        bloom_filter.count = count
+        return bloom_filter
+
+
+class SeenAlertFilter:
+    """Remembers the alerts already processed, so that the alerts still in the
+    lookback window of a collector are not matched again at every period.
+
+    Two Bloom filters are kept: the current one receives the new alerts, and
+    at each rotation (every `rotation_seconds`, or when the current one is
+    full) it replaces the previous one, which is forgotten. An alert is thus
+    remembered for one to two rotation periods, the memory footprint is fixed
+    and the false positive rate stays close to `error_rate`; a false positive
+    means an alert is wrongly skipped.
+
+    :param capacity: number of alerts remembered per rotation period
+    :type capacity: int
+    :param error_rate: target false positive rate
+    :type error_rate: float
+    :param rotation_seconds: time after which the current filter rotates
+    :type rotation_seconds: float
+    :param path: file to persist the filter to, loaded if it exists; a file
+        saved with another capacity or error rate, or corrupted, is ignored
+        and the filter starts empty
+    :type path: str, optional
+    :param clock: returns the current timestamp, defaults to time.time
+    :type clock: callable, optional
+    :param logger: logger warned when the file is ignored, defaults to the
+        logger of this module
+    :type logger: logging.Logger, optional
+    """
+
+    _HEADER = struct.Struct("<dQQ")
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        error_rate: float = DEFAULT_ERROR_RATE,
+        rotation_seconds: float = DEFAULT_ROTATION_SECONDS,
+        path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.rotation_seconds = rotation_seconds
+        self.path = path
+        self._clock = clock
+        self._current = BloomFilter(capacity, error_rate)
+        self._previous = BloomFilter(capacity, error_rate)
+        self._rotated_at = clock()
+        if path is not None and os.path.exists(path):
+            try:
+                self.load()
+            except (ValueError, struct.error) as err:
+                (logger or _logger).warning(
+                    "Ignoring the seen alerts file %s: %s", path, err
+                )
+
+    def _rotate_if_needed(self) -> None:
+        elapsed = self._clock() - self._rotated_at
+        if elapsed >= self.rotation_seconds or len(self._current) >= self.capacity:
+            self.rotate()
+            if elapsed >= 2 * self.rotation_seconds:
+                # the previous filter is outdated too
+                self.rotate()
+
+    def rotate(self) -> None:
+        self._previous = self._current
+        self._current = BloomFilter(self.capacity, self.error_rate)
+        self._rotated_at = self._clock()
+
+    def __contains__(self, alert_id: Key) -> bool:
+        self._rotate_if_needed()
+        return alert_id in self._current or alert_id in self._previous
+
+    def add(self, alert_id: Key) -> None:
+        self._rotate_if_needed()
+        if alert_id not in self._current:
+            self._current.add(alert_id)
+
+    def check_and_add(self, alert_id: Key) -> bool:
+        """Marks an alert as seen.
+
+        :return: whether the alert was already seen
+        :rtype: bool
+        """
+        seen = alert_id in self
+        if not seen:
+            self._current.add(alert_id)
+        return seen
+
+    def save(self) -> None:
+        """Writes the filter to its file, atomically."""
+        if self.path is None:
+            raise ValueError("this filter has no file to be saved to")
+        current, previous = self._current.to_bytes(), self._previous.to_bytes()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        file_descriptor, temp_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                file.write(
+                    self._HEADER.pack(self._rotated_at, len(current), len(previous))
+                )
+                file.write(current)
+                file.write(previous)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def load(self) -> None:
+        """Reads the filter from its file.
+
+        :raises ValueError: if the file was saved with another capacity or
+            error rate
+        :raises struct.error: if the file is truncated
+        """
+        with open(self.path, "rb") as file:
+            data = file.read()
+        rotated_at, current_size, previous_size = self._HEADER.unpack_from(data)
+        offset = self._HEADER.size
+        current = BloomFilter.from_bytes(
+            data[offset : offset + current_size], self.capacity, self.error_rate
+        )
+        offset += current_size
+        previous = BloomFilter.from_bytes(
+            data[offset : offset + previous_size], self.capacity, self.error_rate
+        )
+        self._current, self._previous = current, previous
+        self._rotated_at = rotated_at
@@ -0,0 +1,113 @@
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+__all__ = ["AhoCorasick", "automaton_for"]
+
+# below this number of patterns, searching each of them with str.__contains__
+# is faster than walking the automaton in Python
+DIRECT_SEARCH_MAX_PATTERNS = 100
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton: finds all the occurrences of a set of patterns
+    in a text in a single pass over the text, whatever the number of patterns.
+
+    :param patterns: the strings to look for
+    :type patterns: list[str]
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns = list(patterns)
+        # the empty pattern occurs in any text
+        self.has_empty_pattern = any(pattern == "" for pattern in self.patterns)
+        self._built = False
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # indexes of the patterns ending at each state, fail chain included
+        self._outputs: List[Tuple[int, ...]] = [()]
+        if len(self.patterns) > DIRECT_SEARCH_MAX_PATTERNS:
+            self._build()
+
+    def _build(self) -> None:
+        # the automaton is built on first use, as few patterns are searched
+        # directly
+        for index, pattern in enumerate(self.patterns):
+            if pattern:
+                self._insert(pattern, index)
+        self._build_fail_links()
+        self._built = True
+
+    def _insert(self, pattern: str, index: int) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append(())
+                self._goto[state][char] = next_state
+            state = next_state
+        self._outputs[state] += (index,)
+
+    def _build_fail_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail
+                self._outputs[next_state] += self._outputs[fail]
+
+    def _step(self, state: int, char: str) -> int:
+        goto, fail = self._goto, self._fail
+        while state and char not in goto[state]:
+            state = fail[state]
+        return goto[state].get(char, 0)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yields (end position, pattern index) for each occurrence of a
+        non-empty pattern in `text`."""
+        if not self._built:
+            self._build()
+        state = 0
+        outputs = self._outputs
+        for position, char in enumerate(text):
+            state = self._step(state, char)
+            for index in outputs[state]:
+                yield position + 1, index
+
+    def search_any(self, text: str) -> bool:
+        """Whether any of the patterns occurs in `text`."""
+        if self.has_empty_pattern:
+            return True
+        if not self._built:
+            return any(pattern in text for pattern in self.patterns)
+        state = 0
+        outputs = self._outputs
+        for char in text:
+            state = self._step(state, char)
+            if outputs[state]:
+                return True
+        return False
+
+    def matching_patterns(self, text: str) -> Set[int]:
+        """Returns the indexes of the patterns occurring in `text`."""
+        found = {index for _, index in self.iter_matches(text)}
+        if self.has_empty_pattern:
+            found.update(
+                index for index, pattern in enumerate(self.patterns) if pattern == ""
+            )
+        return found
+
+
+@lru_cache(maxsize=1024)
+def automaton_for(patterns: Tuple[str, ...]) -> AhoCorasick:
+    """Returns an automaton for `patterns`, reused as long as the same
+    patterns are looked for."""
+    return AhoCorasick(patterns)
@@ -0,0 +1,262 @@
+import math
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from rapidfuzz import fuzz, process
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+__all__ = [
+    "FuzzyIndex",
+    "ratio",
+    "min_raw_score",
+    "is_match",
+    "best_matches",
+    "match_any",
+]
+
+
+def ratio(tested: str, reference: str) -> int:
+    """Same score as ``thefuzz.fuzz.ratio``: the rapidfuzz ratio rounded to
+    an integer, without any preprocessing of the strings."""
+    return round(fuzz.ratio(tested, reference))
+
+
+def is_match(score: float, threshold: int, strict: bool = False) -> bool:
+    """Whether a raw rapidfuzz score reaches `threshold` once rounded.
+
+    :param strict: the rounded score must be greater than the threshold,
+        instead of greater or equal
+    :type strict: bool
+    """
+    rounded = int(round(score))
+    return rounded > threshold if strict else rounded >= threshold
+
+
+def min_raw_score(threshold: int, strict: bool = False) -> float:
+    """The lowest raw score that may round to a match, to use as
+    ``score_cutoff``. Scores at the cutoff must still be checked with
+    :func:`is_match` as a half rounds to the nearest even number."""
+    return max(threshold + (0.5 if strict else -0.5), 0)
+
+
+def best_matches(
+    queries: Sequence[str],
+    choices: Sequence[str],
+    threshold: int,
+    *,
+    strict: bool = False,
+    workers: int = 1,
+) -> List[Optional[Tuple[int, int]]]:
+    """Scores every query against every choice in a single batch and returns,
+    for each query, the best matching choice.
+
+    Meant for one-to-many matching, e.g. all the values of an alert against
+    all the signature values of a cycle. When NumPy is installed (``fuzzy``
+    extra) the whole score matrix is computed at once with
+    ``rapidfuzz.process.cdist``, on `workers` threads (-1 uses all the CPU
+    cores). Otherwise each query is matched with ``rapidfuzz.process.extractOne``.
+    In both cases the pairs that cannot reach the threshold are skipped early
+    thanks to the score cutoff.
+
+    :param queries: the values to match, e.g. the values found in alerts
+    :type queries: list[str]
+    :param choices: the values to match against, e.g. the signature values
+    :type choices: list[str]
+    :param threshold: the score to reach, as used by
+        ``Expectation.match_fuzzy``
+    :type threshold: int
+    :param strict: the score must be greater than the threshold
+    :type strict: bool
+    :param workers: number of threads used to compute the score matrix
+    :type workers: int
+
+    :return: for each query, a tuple (choice index, score) of the best match,
+        the first one on ties, or None if no choice reaches the threshold
+    :rtype: list[tuple[int, int] | None]
+    """
+    if not queries:
+        return []
+    if not choices:
+        return [None] * len(queries)
+
+    score_cutoff = min_raw_score(threshold, strict)
+    if score_cutoff > 100:
+        return [None] * len(queries)
+    results: List[Optional[Tuple[int, int]]] = []
+    if numpy is not None:
+        scores = process.cdist(
+            queries,
+            choices,
+            scorer=fuzz.ratio,
+            score_cutoff=score_cutoff,
+            dtype=numpy.float64,
+            workers=workers,
+        )
+        best_indexes = scores.argmax(axis=1)
+        for row, index in enumerate(best_indexes):
+            score = scores[row, index]
+            if is_match(score, threshold, strict):
+                results.append((int(index), int(round(score))))
+            else:
+                results.append(None)
+        return results
+
+    for query in queries:
+        best = process.extractOne(
+            query, choices, scorer=fuzz.ratio, score_cutoff=score_cutoff
+        )
+        if best is not None and is_match(best[1], threshold, strict):
+            results.append((best[2], int(round(best[1]))))
+        else:
+            results.append(None)
+    return results
+
+
+def match_any(
+    tested: Sequence[str], reference: str, threshold: int, strict: bool = False
+) -> Optional[Tuple[int, int]]:
+    """Returns the (index, score) of the tested value closest to `reference`
+    if it reaches the threshold, or None.
+
+    The values are scored one by one: for a single reference and a few
+    values, this is cheaper than a batch (see :func:`best_matches`)."""
+    best: Optional[Tuple[int, int]] = None
+    for index, value in enumerate(tested):
+        score = ratio(value, reference)
+        if (score > threshold if strict else score >= threshold) and (
+            best is None or score > best[1]
+        ):
+            best = (index, score)
+    return best
+
+
+def _ngrams(value: str, size: int) -> Counter:
+    return Counter(value[i : i + size] for i in range(len(value) - size + 1))
+
+
+class FuzzyIndex:
+    """Index over reference values that returns, for a tested value, only the
+    references that can reach a fuzzy ratio threshold.
+
+    The ratio is ``200 * LCS / (len(a) + len(b))``, LCS being the length of
+    the longest common subsequence, so a score is only reachable when:
+
+    * the lengths are close enough: ``len(b)`` must be in
+      ``[len(a) * c / (200 - c), len(a) * (200 - c) / c]``, c being the lowest
+      raw score that rounds to a match;
+    * enough n-grams are shared: turning `a` into `b` deletes
+      ``len(a) - LCS`` characters and inserts ``len(b) - LCS``, each of them
+      breaking a bounded number of n-grams, and the n-grams left intact in
+      `a` are all found in `b`.
+
+    References that pass both filters are candidates, to be scored as usual:
+    the final results are the same as scoring every pair.
+
+    :param references: the values to index, e.g. signature values
+    :type references: list[str]
+    :param ngram_size: size of the n-grams, defaults to trigrams
+    :type ngram_size: int
+    """
+
+    def __init__(self, references: Sequence[str], ngram_size: int = 3):
+        self.references = list(references)
+        self.ngram_size = ngram_size
+        self._by_length: Dict[int, List[int]] = {}
+        self._by_value: Dict[str, List[int]] = {}
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        for index, reference in enumerate(self.references):
+            self._by_length.setdefault(len(reference), []).append(index)
+            self._by_value.setdefault(reference, []).append(index)
+            for ngram, count in _ngrams(reference, ngram_size).items():
+                self._postings.setdefault(ngram, []).append((index, count))
+        self._lengths = sorted(self._by_length)
+
+    def __len__(self) -> int:
+        return len(self.references)
+
+    def _min_shared_ngrams(self, length: int, other_length: int, min_lcs: int) -> int:
+        # n-grams of one string left intact in the other: each deleted character
+        # breaks at most n of them, each inserted character at most n - 1
+        return (
+            length
+            - self.ngram_size
+            + 1
+            - self.ngram_size * (length - min_lcs)
+            - (self.ngram_size - 1) * (other_length - min_lcs)
+        )
+
+    def candidates(
+        self, tested: str, threshold: int, strict: bool = False
+    ) -> List[int]:
+        """Returns the sorted indexes of the references that may reach the
+        threshold against `tested`. Every reference that does is included.
+
+        :param tested: the value to match, e.g. a value found in an alert
+        :type tested: str
+        :param threshold: the score to reach, as for ``Expectation.match_fuzzy``
+        :type threshold: int
+        :param strict: the score must be greater than the threshold
+        :type strict: bool
+
+        :return: the indexes of the candidate references
+        :rtype: list[int]
+        """
+        cutoff = min_raw_score(threshold, strict)
+        if cutoff > 100:
+            return []
+        if cutoff <= 0:
+            return list(range(len(self.references)))
+        tested_length = len(tested)
+        if cutoff >= 99.5 and tested_length < 100:
+            # different strings need 100 characters or more to round to 100
+            return list(self._by_value.get(tested, []))
+
+        lowest = math.ceil(tested_length * cutoff / (200 - cutoff) - 1e-9)
+        highest = math.floor(tested_length * (200 - cutoff) / cutoff + 1e-9)
+        shared: Optional[Counter] = None
+        results = []
+        for length in self._lengths:
+            if length < lowest:
+                continue
+            if length > highest:
+                break
+            # the LCS cannot be shorter than this for the ratio to reach cutoff
+            min_lcs = math.ceil(cutoff * (tested_length + length) / 200 - 1e-9)
+            required = max(
+                self._min_shared_ngrams(tested_length, length, min_lcs),
+                self._min_shared_ngrams(length, tested_length, min_lcs),
+            )
+            if required <= 0:
+                results.extend(self._by_length[length])
+                continue
+            if shared is None:
+                shared = self._count_shared_ngrams(tested)
+            results.extend(
+                index for index in self._by_length[length] if shared[index] >= required
+            )
+        results.sort()
+        return results
+
+    def _count_shared_ngrams(self, tested: str) -> Counter:
+        shared: Counter = Counter()
+        for ngram, count in _ngrams(tested, self.ngram_size).items():
+            for index, reference_count in self._postings.get(ngram, ()):
+                shared[index] += min(count, reference_count)
+        return shared
+
+    def best_match(
+        self, tested: str, threshold: int, strict: bool = False
+    ) -> Optional[Tuple[int, int]]:
+        """Returns the (index, score) of the reference closest to `tested`,
+        the first one on ties, if it reaches the threshold, or None. Only the
+        candidate references are scored."""
+        best = None
+        for index in self.candidates(tested, threshold, strict):
+            score = fuzz.ratio(tested, self.references[index])
+            if is_match(score, threshold, strict) and (best is None or score > best[1]):
+                best = (index, score)
+        return None if best is None else (best[0], int(round(best[1])))
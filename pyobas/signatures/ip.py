@@ -0,0 +1,108 @@
+import ipaddress
+from functools import lru_cache
+from typing import Any, Dict, Generic, Iterable, List, Optional, TypeVar, Union
+
+__all__ = ["IPNetworkIndex", "any_within", "parse_network"]
+
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+T = TypeVar("T")
+
+
+@lru_cache(maxsize=100_000)
+def parse_network(value: str) -> Optional[IPNetwork]:
+    """Parses an IP address or a CIDR range, once per value. An address is
+    a network of a single address, and host bits set in a range are ignored.
+
+    :param value: e.g. "10.0.0.1", "10.0.0.0/8" or "fe80::/10"
+    :type value: str
+
+    :return: the network, or None if the value is not an IP address or range
+    :rtype: IPv4Network | IPv6Network | None
+    """
+    try:
+        return ipaddress.ip_network(value.strip(), strict=False)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def any_within(values: Iterable[str], reference: str) -> bool:
+    """Whether any of the IP addresses (or ranges) `values` is within the
+    reference address or range. Values that are not IP addresses or ranges
+    never match.
+
+    :param values: the IP addresses to test, e.g. from an alert
+    :type values: list[str]
+    :param reference: the IP address or CIDR range, e.g. "10.0.0.0/8"
+    :type reference: str
+
+    :rtype: bool
+    """
+    if (network := parse_network(reference)) is None:
+        return False
+    for value in values:
+        tested = parse_network(value)
+        if (
+            tested is not None
+            and tested.version == network.version
+            and tested.subnet_of(network)
+        ):
+            return True
+    return False
+
+
+class _Node:
+    __slots__ = ("children", "items")
+
+    def __init__(self) -> None:
+        self.children: List[Optional["_Node"]] = [None, None]
+        self.items: List[Any] = []
+
+
+class IPNetworkIndex(Generic[T]):
+    """Binary prefix trie of IP networks: finds the networks containing an
+    address by walking its bits once, whatever the number of networks.
+
+    Each network is stored at the depth of its prefix length, so the
+    networks containing an address are the ones met on the path of its bits.
+    IPv4 and IPv6 networks are kept in separate tries.
+    """
+
+    def __init__(self) -> None:
+        self._roots: Dict[int, _Node] = {4: _Node(), 6: _Node()}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, network: IPNetwork, item: T) -> None:
+        bits = int(network.network_address)
+        max_prefix = network.max_prefixlen
+        node = self._roots[network.version]
+        for depth in range(network.prefixlen):
+            bit = (bits >> (max_prefix - depth - 1)) & 1
+            if (child := node.children[bit]) is None:
+                child = node.children[bit] = _Node()
+            node = child
+        node.items.append(item)
+        self._size += 1
+
+    def containing(self, network: IPNetwork) -> List[T]:
+        """Returns the items of the networks containing `network`, an address
+        being a network of a single address, from the widest network to the
+        narrowest.
+
+        :param network: the network to look up
+        :type network: IPv4Network | IPv6Network
+
+        :rtype: list
+        """
+        bits = int(network.network_address)
+        max_prefix = network.max_prefixlen
+        node = self._roots[network.version]
+        found = list(node.items)
+        for depth in range(network.prefixlen):
+            node = node.children[(bits >> (max_prefix - depth - 1)) & 1]
+            if node is None:
+                break
+            found.extend(node.items)
+        return found
@@ -0,0 +1,92 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from pyobas.signatures.types import MatchTypes
+
+__all__ = ["MatchPlanner"]
+
+# relative cost of checking one signature against an alert signature of each
+# match type: an equality, a walk in a prefix trie, a regex scan, a substring
+# scan, then a full edit distance computation
+DEFAULT_COSTS = {
+    MatchTypes.MATCH_TYPE_SIMPLE.value: 1.0,
+    MatchTypes.MATCH_TYPE_IP.value: 2.0,
+    MatchTypes.MATCH_TYPE_REGEX.value: 4.0,
+    MatchTypes.MATCH_TYPE_SUBSTRING.value: 4.0,
+    MatchTypes.MATCH_TYPE_FUZZY.value: 8.0,
+}
+
+
+class MatchPlanner:
+    """Orders the signature checks of Expectation.match_alert.
+
+    An alert matches an expectation only if it matches all its relevant
+    signatures, so the checks can run in any order and stop at the first
+    failure: the cheapest checks that are the most likely to fail should run
+    first. Each check is ranked by its cost divided by its estimated failure
+    rate, which is the order minimizing the expected cost of the whole
+    evaluation. The pass rate of each signature type and match type is
+    learned from the checks the planner is told about, and aged at each
+    new_cycle() so that it follows the alerts of the latest cycles.
+
+    Signatures for which the alert has no data are checked first: they fail
+    without any comparison.
+
+    :param costs: cost of a check for each match type, defaults to
+        DEFAULT_COSTS; unknown match types are not checked and cost nothing
+    :type costs: dict[str, float], optional
+    :param decay: factor applied to the statistics at each new cycle
+    :type decay: float
+    """
+
+    def __init__(
+        self, costs: Optional[Dict[str, float]] = None, decay: float = 0.5
+    ) -> None:
+        self.costs = dict(DEFAULT_COSTS if costs is None else costs)
+        self.decay = decay
+        # (signature type, match type) -> [checks, passed checks]
+        self._statistics: Dict[Tuple[str, str], List[float]] = {}
+
+    def new_cycle(self) -> None:
+        """Ages the statistics learned so far."""
+        for statistics in self._statistics.values():
+            statistics[0] *= self.decay
+            statistics[1] *= self.decay
+
+    def pass_rate(self, signature_type: str, match_type: str) -> float:
+        """The estimated probability that a check passes, 0.5 when nothing was
+        learned yet."""
+        checks, passed = self._statistics.get((signature_type, match_type), (0, 0))
+        return (passed + 1) / (checks + 2)
+
+    def rank(self, signature: Any, alert_data: Dict[str, Dict[str, Any]]) -> float:
+        signature_type = getattr(signature.type, "value", signature.type)
+        if not (alert_signature := alert_data.get(signature_type)):
+            return -1.0
+        match_type = alert_signature.get("type")
+        match_type = getattr(match_type, "value", match_type)
+        cost = self.costs.get(match_type, 0.0)
+        return cost / (1 - self.pass_rate(signature_type, match_type))
+
+    def order(self, signatures: List[Any], alert_data: Dict[str, Dict[str, Any]]):
+        """Returns the signatures in the order they should be checked.
+
+        :param signatures: the relevant signatures of an expectation
+        :type signatures: list[ExpectationSignature]
+        :param alert_data: the alert data they are checked against
+        :type alert_data: dict[SignatureTypes, dict]
+
+        :rtype: list[ExpectationSignature]
+        """
+        return sorted(
+            signatures, key=lambda signature: self.rank(signature, alert_data)
+        )
+
+    def record(self, signature: Any, alert_signature: Dict[str, Any], passed: bool):
+        """Learns from the result of a check."""
+        signature_type = getattr(signature.type, "value", signature.type)
+        match_type = alert_signature.get("type")
+        match_type = getattr(match_type, "value", match_type)
+        statistics = self._statistics.setdefault((signature_type, match_type), [0, 0])
+        statistics[0] += 1
+        if passed:
+            statistics[1] += 1
@@ -0,0 +1,89 @@
+import re
+from functools import lru_cache
+from typing import List, Optional, Pattern, Sequence, Set, Tuple
+
+__all__ = ["RegexSet", "compile_pattern", "regex_set_for"]
+
+# patterns whose meaning changes once embedded in a bigger expression:
+# references to their own groups, whose numbers and names would be shifted
+_SELF_REFERENCE = re.compile(r"\\[1-9]|\\g<|\(\?P=|\(\?\(")
+
+
+@lru_cache(maxsize=4096)
+def compile_pattern(pattern: str) -> Optional[Pattern]:
+    """Compiles a regex signature, once per pattern.
+
+    :param pattern: the regular expression
+    :type pattern: str
+
+    :return: the compiled pattern, or None if it is not a valid expression
+    :rtype: re.Pattern | None
+    """
+    try:
+        return re.compile(pattern)
+    except re.error:
+        return None
+
+
+class RegexSet:
+    """Tests a set of regular expressions against a text in a single call to
+    the regex engine.
+
+    The patterns are combined into one expression made of one optional
+    lookahead per pattern, each capturing in a named group: matching it at
+    the start of a text tells which patterns occur anywhere in the text, as
+    re.search would for each of them. The patterns that cannot be combined
+    (global inline flags, references to their own groups) are searched one by
+    one, and invalid patterns never match.
+
+    :param patterns: the regular expressions
+    :type patterns: list[str]
+    """
+
+    def __init__(self, patterns: Sequence[str]) -> None:
+        self.patterns = list(patterns)
+        self._separate: List[Tuple[int, Pattern]] = []
+        combined = []
+        for index, pattern in enumerate(self.patterns):
+            if (compiled := compile_pattern(pattern)) is None:
+                continue
+            if not compiled.groupindex and not _SELF_REFERENCE.search(pattern):
+                part = rf"(?:(?=[\s\S]*?(?P<p{index}>{pattern}))|)"
+                try:
+                    re.compile(part)
+                except re.error:
+                    pass
+                else:
+                    combined.append(part)
+                    continue
+            self._separate.append((index, compiled))
+        self._combined = re.compile("".join(combined)) if combined else None
+
+    def matching(self, text: str) -> Set[int]:
+        """Returns the indexes of the patterns found in `text`."""
+        found = set()
+        if self._combined is not None:
+            found.update(
+                int(name[1:])
+                for name, group in self._combined.match(text).groupdict().items()
+                if group is not None
+            )
+        found.update(
+            index for index, compiled in self._separate if compiled.search(text)
+        )
+        return found
+
+    def search_any(self, text: str) -> bool:
+        """Whether any of the patterns is found in `text`."""
+        if self._combined is not None and any(
+            group is not None for group in self._combined.match(text).groups()
+        ):
+            return True
+        return any(compiled.search(text) for _, compiled in self._separate)
+
+
+@lru_cache(maxsize=1024)
+def regex_set_for(patterns: Tuple[str, ...]) -> RegexSet:
+    """Returns a RegexSet for `patterns`, reused as long as the same patterns
+    are looked for."""
+    return RegexSet(patterns)
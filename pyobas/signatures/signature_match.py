@@ -4,7 +4,7 @@ from pyobas.signatures.types import MatchTypes
 
 class SignatureMatch:
     def __init__(self, match_type: MatchTypes, match_score: int | None):
-        if match_score is None and match_type != MatchTypes.MATCH_TYPE_SIMPLE:
+        if match_score is None and match_type == MatchTypes.MATCH_TYPE_FUZZY:
             raise OpenBASError(
                 f"Match type {match_type} requires score to be set, found score = {match_score}"
             )
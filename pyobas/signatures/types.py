@@ -4,6 +4,9 @@ from enum import Enum
 class MatchTypes(str, Enum):
     MATCH_TYPE_FUZZY = "fuzzy"
     MATCH_TYPE_SIMPLE = "simple"
+    MATCH_TYPE_SUBSTRING = "substring"
+    MATCH_TYPE_REGEX = "regex"
+    MATCH_TYPE_IP = "ip"
 
 
 class SignatureTypes(str, Enum):
@@ -1,11 +1,24 @@
+import collections
 import dataclasses
 import datetime
 import email.message
+import functools
 import json
 import logging
 import threading
 import urllib.parse
-from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
 import requests
 from pythonjsonlogger import jsonlogger
@@ -71,6 +84,20 @@ class EncodedId(str):
         return super().__new__(cls, value)
 
 
+@functools.lru_cache(maxsize=None)
+def record_type(fields: Tuple[str, ...]) -> Type[Tuple[Any, ...]]:
+    """Returns a compact record class (a named tuple, without per-instance dict)
+    holding the given fields. Classes are cached so that every projection on the
+    same fields shares the same type."""
+    return collections.namedtuple("Record", fields, rename=True)
+
+
+def project(data: Dict[str, Any], fields: Sequence[str]) -> Tuple[Any, ...]:
+    """Keeps only `fields` from `data` and returns them as a compact record.
+    Missing keys are set to None."""
+    return record_type(tuple(fields))(*map(data.get, fields))
+
+
 def remove_none_from_dict(data: Dict[str, Any]) -> Dict[str, Any]:
     return {k: v for k, v in data.items() if v is not None}
 
@@ -0,0 +1,142 @@
+"""Measures OpenBASDetectionHelper.match_alert_elements on a realistic cycle:
+every alert of the cycle is matched against every pending command line
+signature, as collectors do.
+
+The reference implementation below is the helper as it was before signature
+and alert normalization were memoized and before command-line signatures were
+matched with an Aho-Corasick automaton.
+
+Usage: python scripts/bench_detection_helper.py [--alerts N] [--signatures N]
+"""
+
+import argparse
+import base64
+import logging
+import random
+import re
+import string
+import time
+
+from pyobas.helpers import OpenBASDetectionHelper
+
+
+class ReferenceDetectionHelper(OpenBASDetectionHelper):
+    def new_cycle(self):
+        pass
+
+    def _normalize_signature_value(self, signature_value):
+        return self._decode_value(signature_value).strip().lower()
+
+    def _normalize_alert_values(self, alert_values):
+        return [value.strip().lower() for value in alert_values]
+
+    def _match_alert_elements_for_command_line(self, signatures, alert_data):
+        command_line_signatures = [
+            signature
+            for signature in signatures
+            if signature.get("type") == "command_line"
+        ]
+        if len(command_line_signatures) == 0:
+            return False
+        key_types = ["command_line", "process_name", "file_name"]
+        alert_datas = [alert_data.get(key) for key in key_types if key in alert_data]
+        for signature in command_line_signatures:
+            signature_result = False
+            signature_value = self._decode_value(signature["value"]).strip().lower()
+            for alert_data in alert_datas:
+                trimmed_lowered_datas = [s.strip().lower() for s in alert_data["data"]]
+                signature_result = any(
+                    data in signature_value for data in trimmed_lowered_datas
+                )
+            if signature_result:
+                return True
+        return False
+
+    def _decode_value(self, signature_value):
+        if _reference_is_base64_encoded(signature_value):
+            return base64.b64decode(signature_value).decode("utf-8")
+        return signature_value
+
+
+def _reference_is_base64_encoded(str_maybe_base64):
+    base64_pattern = re.compile(r"^[A-Za-z0-9+/]*={0,2}$")
+    return len(str_maybe_base64) % 4 == 0 and bool(
+        base64_pattern.match(str_maybe_base64)
+    )
+
+
+def random_command_line(rng):
+    executable = rng.choice(["powershell.exe", "cmd.exe", "rundll32.exe", "wmic"])
+    arguments = " ".join(
+        "".join(rng.choices(string.ascii_letters + string.digits, k=rng.randint(4, 12)))
+        for _ in range(rng.randint(2, 8))
+    )
+    return f"{executable} {arguments}"
+
+
+def make_cycle(rng, alerts_count, signatures_count):
+    signatures = []
+    for _ in range(signatures_count):
+        command_line = random_command_line(rng)
+        if rng.random() < 0.5:
+            # implants send base64 encoded command lines
+            command_line = base64.b64encode(command_line.encode()).decode()
+        signatures.append({"type": "command_line", "value": command_line})
+    alerts = []
+    for _ in range(alerts_count):
+        alerts.append(
+            {
+                "command_line": {
+                    "type": "simple",
+                    "data": [random_command_line(rng) for _ in range(3)],
+                },
+                "process_name": {
+                    "type": "simple",
+                    "data": [rng.choice(["powershell.exe", "cmd.exe"])],
+                },
+            }
+        )
+    return signatures, alerts
+
+
+def run(helper, signatures, alerts):
+    helper.new_cycle()
+    start = time.perf_counter()
+    matches = 0
+    for alert_data in alerts:
+        for signature in signatures:
+            # as collectors do, one expectation (one signature) at a time
+            matches += helper.match_alert_elements([signature], alert_data)
+    return time.perf_counter() - start, matches
+
+
+def main():
+    parser = argparse.ArgumentParser("bench_detection_helper")
+    parser.add_argument("--alerts", type=int, default=500)
+    parser.add_argument("--signatures", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    signatures, alerts = make_cycle(
+        random.Random(args.seed), args.alerts, args.signatures
+    )
+    logger = logging.getLogger("bench")
+    relevant_signatures_types = ["command_line", "process_name"]
+
+    reference_time, reference_matches = run(
+        ReferenceDetectionHelper(logger, relevant_signatures_types), signatures, alerts
+    )
+    memoized_time, memoized_matches = run(
+        OpenBASDetectionHelper(logger, relevant_signatures_types), signatures, alerts
+    )
+    assert reference_matches == memoized_matches
+
+    pairs = args.alerts * args.signatures
+    print(f"{args.alerts} alerts x {args.signatures} signatures ({pairs} pairs)")
+    print(f"reference: {reference_time:.3f}s")
+    print(f"current:   {memoized_time:.3f}s")
+    print(f"speedup:   {reference_time / memoized_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
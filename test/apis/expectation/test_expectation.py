@@ -4,6 +4,7 @@ from uuid import uuid4
 from pyobas.apis.inject_expectation.model import (
     DetectionExpectation,
     PreventionExpectation,
+    build_expectations,
 )
 from pyobas.signatures.signature_type import SignatureType
 from pyobas.signatures.types import MatchTypes, SignatureTypes
@@ -330,6 +331,167 @@ class TestExpectation(unittest.TestCase):
 
         self.assertFalse(matched)
 
+    def test_when_substring_signature_type_match_alert_when_signature_contains_value(
+        self,
+    ):
+        model = DetectionExpectation(
+            **{
+                "inject_expectation_id": uuid4(),
+                "inject_expectation_signatures": [
+                    {
+                        "type": SignatureTypes.SIG_TYPE_PARENT_PROCESS_NAME,
+                        "value": "C:\\Windows\\Parent.exe",
+                    },
+                ],
+            },
+            api_client=create_mock_api_client(),
+        )
+        parent_process_signature_type = SignatureType(
+            label=SignatureTypes.SIG_TYPE_PARENT_PROCESS_NAME,
+            match_type=MatchTypes.MATCH_TYPE_SUBSTRING,
+        )
+        relevant_signature_types = [parent_process_signature_type]
+
+        def alert_data(data):
+            return {
+                parent_process_signature_type.label.value: parent_process_signature_type.make_struct_for_matching(
+                    data=data
+                )
+            }
+
+        self.assertTrue(
+            model.match_alert(relevant_signature_types, alert_data(["PARENT.EXE "]))
+        )
+        self.assertFalse(
+            model.match_alert(relevant_signature_types, alert_data(["other.exe"]))
+        )
+
+    def test_when_regex_signature_type_match_alert_when_expression_found(self):
+        model = DetectionExpectation(
+            **{
+                "inject_expectation_id": uuid4(),
+                "inject_expectation_signatures": [
+                    {
+                        "type": SignatureTypes.SIG_TYPE_COMMAND_LINE,
+                        "value": r"whoami\s+/all",
+                    },
+                ],
+            },
+            api_client=create_mock_api_client(),
+        )
+        command_line_signature_type = SignatureType(
+            label=SignatureTypes.SIG_TYPE_COMMAND_LINE,
+            match_type=MatchTypes.MATCH_TYPE_REGEX,
+        )
+        relevant_signature_types = [command_line_signature_type]
+
+        def alert_data(data):
+            return {
+                command_line_signature_type.label.value: command_line_signature_type.make_struct_for_matching(
+                    data=data
+                )
+            }
+
+        self.assertTrue(
+            model.match_alert(
+                relevant_signature_types, alert_data(["cmd.exe /c whoami  /all"])
+            )
+        )
+        self.assertFalse(
+            model.match_alert(relevant_signature_types, alert_data("whoami"))
+        )
+
+    def test_when_ip_signature_type_match_alert_when_address_in_range(self):
+        model = DetectionExpectation(
+            **{
+                "inject_expectation_id": uuid4(),
+                "inject_expectation_signatures": [
+                    {"type": SignatureTypes.SIG_TYPE_IPV4, "value": "10.0.0.0/8"},
+                ],
+            },
+            api_client=create_mock_api_client(),
+        )
+        ipv4_signature_type = SignatureType(
+            label=SignatureTypes.SIG_TYPE_IPV4, match_type=MatchTypes.MATCH_TYPE_IP
+        )
+        relevant_signature_types = [ipv4_signature_type]
+
+        def alert_data(data):
+            return {
+                ipv4_signature_type.label.value: ipv4_signature_type.make_struct_for_matching(
+                    data=data
+                )
+            }
+
+        self.assertTrue(
+            model.match_alert(relevant_signature_types, alert_data("10.20.30.40"))
+        )
+        self.assertFalse(
+            model.match_alert(relevant_signature_types, alert_data(["11.0.0.1"]))
+        )
+
+
+class TestBuildExpectations(unittest.TestCase):
+    def test_build_expectations_dispatch_on_type(self):
+        api_client = create_mock_api_client()
+        expectation_dicts = [
+            {
+                "inject_expectation_id": str(uuid4()),
+                "inject_expectation_type": expectation_type,
+                "inject_expectation_signatures": [
+                    {"type": "parent_process_name", "value": "parent.exe"}
+                ],
+            }
+            for expectation_type in ("DETECTION", "PREVENTION", "VULNERABILITY")
+        ]
+
+        expectations = build_expectations(expectation_dicts, api_client=api_client)
+
+        self.assertEqual(
+            [type(expectation) for expectation in expectations],
+            [DetectionExpectation, PreventionExpectation, PreventionExpectation],
+        )
+        self.assertEqual(
+            expectations[0],
+            DetectionExpectation(**expectation_dicts[0], api_client=api_client),
+        )
+        self.assertEqual(
+            expectations[0].inject_expectation_signatures[0].type,
+            SignatureTypes.SIG_TYPE_PARENT_PROCESS_NAME,
+        )
+
+        expectations[1].update(success=True, sender_id="collector", metadata={})
+
+        api_client.update.assert_called_once_with(
+            expectations[1].inject_expectation_id,
+            inject_expectation={
+                "collector_id": "collector",
+                "result": "Prevented",
+                "is_success": True,
+                "metadata": {},
+            },
+        )
+
+    def test_build_expectations_keep_the_order_of_the_dicts(self):
+        expectation_dicts = [
+            {
+                "inject_expectation_id": str(uuid4()),
+                "inject_expectation_type": expectation_type,
+                "inject_expectation_signatures": [],
+            }
+            for expectation_type in ("PREVENTION", "DETECTION", "other", "DETECTION")
+        ]
+
+        expectations = build_expectations(expectation_dicts)
+
+        self.assertEqual(
+            [str(expectation.inject_expectation_id) for expectation in expectations],
+            [
+                expectation_dict["inject_expectation_id"]
+                for expectation_dict in expectation_dicts
+            ],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
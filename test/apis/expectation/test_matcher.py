@@ -0,0 +1,190 @@
+import unittest.mock
+from uuid import uuid4
+
+from pyobas.apis.inject_expectation.matcher import ExpectationMatcher
+from pyobas.apis.inject_expectation.model import DetectionExpectation
+from pyobas.signatures.signature_type import SignatureType
+from pyobas.signatures.types import MatchTypes, SignatureTypes
+
+HOSTNAME = SignatureType(
+    label=SignatureTypes.SIG_TYPE_HOSTNAME, match_type=MatchTypes.MATCH_TYPE_SIMPLE
+)
+PARENT_PROCESS = SignatureType(
+    label=SignatureTypes.SIG_TYPE_PARENT_PROCESS_NAME,
+    match_type=MatchTypes.MATCH_TYPE_FUZZY,
+    match_score=80,
+)
+RELEVANT_SIGNATURE_TYPES = [HOSTNAME, PARENT_PROCESS]
+
+
+def create_expectation(**signatures):
+    return DetectionExpectation(
+        **{
+            "inject_expectation_id": uuid4(),
+            "inject_expectation_signatures": [
+                {"type": type, "value": value} for type, value in signatures.items()
+            ],
+        },
+        api_client=unittest.mock.MagicMock(),
+    )
+
+
+def create_alert(hostname=None, parent_process=None):
+    alert_data = {}
+    if hostname is not None:
+        alert_data[HOSTNAME.label.value] = HOSTNAME.make_struct_for_matching(hostname)
+    if parent_process is not None:
+        alert_data[PARENT_PROCESS.label.value] = (
+            PARENT_PROCESS.make_struct_for_matching(parent_process)
+        )
+    return alert_data
+
+
+class TestExpectationMatcher(unittest.TestCase):
+    def setUp(self):
+        self.expectations = [
+            create_expectation(hostname="host-a", parent_process_name="parent.exe"),
+            create_expectation(hostname="host-b", parent_process_name="parent.exe"),
+            create_expectation(parent_process_name="other.exe"),
+            create_expectation(hostname="h" * 150),
+            create_expectation(file_name="irrelevant.txt"),
+            create_expectation(hostname="host-a"),
+        ]
+        self.matcher = ExpectationMatcher(self.expectations, RELEVANT_SIGNATURE_TYPES)
+
+    def assert_same_as_match_alert(self, alert_data):
+        expected = [
+            expectation
+            for expectation in self.expectations
+            if expectation.match_alert(RELEVANT_SIGNATURE_TYPES, alert_data)
+        ]
+        self.assertEqual(self.matcher.match(alert_data), expected)
+        return expected
+
+    def test_when_simple_anchor_only_candidates_with_alert_value(self):
+        alert_data = create_alert(hostname="host-a", parent_process="parent.exe")
+
+        candidates = self.matcher.candidates(alert_data)
+
+        self.assertNotIn(self.expectations[1], candidates)
+        self.assertNotIn(self.expectations[3], candidates)
+        self.assertEqual(
+            self.assert_same_as_match_alert(alert_data),
+            [self.expectations[0], self.expectations[5]],
+        )
+
+    def test_when_alert_has_list_of_values_look_up_each_value(self):
+        self.assertEqual(
+            self.assert_same_as_match_alert(
+                create_alert(hostname=["host-b", "host-c"], parent_process="parent.ex")
+            ),
+            [self.expectations[1]],
+        )
+
+    def test_when_long_simple_signature_match_nearly_equal_values(self):
+        alert_data = create_alert(hostname="h" * 199 + "x")
+
+        self.assertEqual(
+            self.assert_same_as_match_alert(create_alert(hostname="h" * 150)),
+            [self.expectations[3]],
+        )
+        self.assert_same_as_match_alert(alert_data)
+
+    def test_when_fuzzy_anchor_only_candidates_reaching_threshold(self):
+        alert_data = create_alert(parent_process="other.ex")
+
+        self.assertEqual(self.matcher.candidates(alert_data), [self.expectations[2]])
+        self.assertEqual(
+            self.assert_same_as_match_alert(alert_data), [self.expectations[2]]
+        )
+
+    def test_when_alert_type_is_fuzzy_use_alert_score(self):
+        alert_data = {
+            HOSTNAME.label.value: {"type": "fuzzy", "data": "host-", "score": 80}
+        }
+
+        self.assertEqual(
+            self.assert_same_as_match_alert(alert_data),
+            [self.expectations[5]],
+        )
+
+    def test_when_no_relevant_signature_never_candidate(self):
+        alert_data = create_alert(hostname="host-a", parent_process="parent.exe")
+        alert_data[SignatureTypes.SIG_TYPE_FILE_NAME.value] = (
+            HOSTNAME.make_struct_for_matching("irrelevant.txt")
+        )
+
+        self.assertNotIn(self.expectations[4], self.matcher.candidates(alert_data))
+
+    def test_when_alert_type_is_regex_only_candidates_with_matching_expression(
+        self,
+    ):
+        expectations = [
+            create_expectation(hostname=r"^host-\d+$"),
+            create_expectation(hostname=r"^web-"),
+            create_expectation(hostname=r"(?i)HOST"),
+            create_expectation(hostname="["),
+        ]
+        matcher = ExpectationMatcher(expectations, RELEVANT_SIGNATURE_TYPES)
+        alert_data = {HOSTNAME.label.value: {"type": "regex", "data": ["host-42"]}}
+
+        self.assertEqual(
+            matcher.candidates(alert_data), [expectations[0], expectations[2]]
+        )
+        self.assertEqual(
+            matcher.match(alert_data),
+            [
+                expectation
+                for expectation in expectations
+                if expectation.match_alert(RELEVANT_SIGNATURE_TYPES, alert_data)
+            ],
+        )
+
+    def test_when_alert_type_is_ip_only_candidates_with_containing_range(self):
+        ipv4 = SignatureType(
+            label=SignatureTypes.SIG_TYPE_IPV4, match_type=MatchTypes.MATCH_TYPE_IP
+        )
+        expectations = [
+            create_expectation(ipv4_address="10.0.0.0/8"),
+            create_expectation(ipv4_address="10.1.2.3"),
+            create_expectation(ipv4_address="192.168.0.0/16"),
+            create_expectation(ipv4_address="not an ip"),
+        ]
+        matcher = ExpectationMatcher(expectations, [ipv4])
+        alert_data = {ipv4.label.value: ipv4.make_struct_for_matching(["10.1.2.3"])}
+
+        self.assertEqual(
+            matcher.candidates(alert_data), [expectations[0], expectations[1]]
+        )
+        self.assertEqual(matcher.match(alert_data), [expectations[0], expectations[1]])
+
+    def test_expectations_with_same_relevant_signatures_matched_once(self):
+        expectations = [
+            create_expectation(
+                hostname="host-a",
+                parent_process_name="parent.exe",
+                file_name=f"irrelevant-{index}.txt",
+            )
+            for index in range(50)
+        ] + [
+            create_expectation(parent_process_name="parent.exe", hostname="host-a"),
+            create_expectation(hostname="host-b", parent_process_name="parent.exe"),
+        ]
+        matcher = ExpectationMatcher(expectations, RELEVANT_SIGNATURE_TYPES)
+        alert_data = create_alert(hostname="host-a", parent_process="parent.exe")
+
+        with unittest.mock.patch.object(
+            DetectionExpectation, "match_alert", autospec=True, return_value=True
+        ) as match_alert:
+            matched = matcher.match(alert_data)
+
+        self.assertEqual(matcher.group_count, 2)
+        self.assertEqual(match_alert.call_count, 1)
+        self.assertEqual(matched, expectations[:51])
+
+    def test_when_alert_is_empty_no_candidate(self):
+        self.assertEqual(self.matcher.candidates({}), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from pyobas import OpenBAS
+from pyobas.apis.inject_expectation import ExpectationStore, InjectExpectationManager
+from pyobas.apis.inject_expectation.model import (
+    DetectionExpectation,
+    PreventionExpectation,
+)
+
+
+def create_expectation_dict(expectation_type="DETECTION", value="parent.exe"):
+    return {
+        "inject_expectation_id": str(uuid4()),
+        "inject_expectation_type": expectation_type,
+        "inject_expectation_signatures": [
+            {"type": "parent_process_name", "value": value}
+        ],
+    }
+
+
+class TestExpectationStore(unittest.TestCase):
+    def setUp(self):
+        self.manager = InjectExpectationManager(
+            OpenBAS(url="http://fake", token="fake")
+        )
+        self.store = ExpectationStore(self.manager, "collector")
+        self.detection = create_expectation_dict()
+        self.prevention = create_expectation_dict("PREVENTION")
+
+    def sync(self, expectation_dicts):
+        with patch.object(
+            self.manager,
+            "expectations_assets_for_source",
+            return_value=expectation_dicts,
+        ) as expectations_assets_for_source:
+            delta = self.store.sync(expiration_time=60)
+        expectations_assets_for_source.assert_called_once_with(
+            source_id="collector", expiration_time=60
+        )
+        return delta
+
+    def test_first_sync_build_all_expectations(self):
+        delta = self.sync([self.detection, self.prevention])
+
+        self.assertEqual(len(delta.added), 2)
+        self.assertEqual(delta.updated, [])
+        self.assertEqual(delta.removed, [])
+        self.assertIsInstance(
+            self.store.get(self.detection["inject_expectation_id"]),
+            DetectionExpectation,
+        )
+        self.assertIsInstance(self.store.expectations[1], PreventionExpectation)
+
+    def test_when_nothing_changed_keep_expectations_untouched(self):
+        self.sync([self.detection, self.prevention])
+        expectations = self.store.expectations
+
+        with patch.object(
+            self.manager, "expectation_models", MagicMock(return_value=[])
+        ) as expectation_models:
+            delta = self.sync([dict(self.detection), dict(self.prevention)])
+
+        self.assertFalse(delta)
+        expectation_models.assert_called_once_with([])
+        self.assertEqual(self.store.expectations, expectations)
+        self.assertIs(self.store.expectations[0], expectations[0])
+
+    def test_apply_additions_changes_and_removals(self):
+        self.sync([self.detection, self.prevention])
+        removed = self.store.get(self.prevention["inject_expectation_id"])
+        changed = dict(
+            self.detection,
+            inject_expectation_signatures=[
+                {"type": "parent_process_name", "value": "other.exe"}
+            ],
+        )
+        new = create_expectation_dict()
+
+        delta = self.sync([changed, new])
+
+        self.assertEqual(
+            [str(e.inject_expectation_id) for e in delta.added],
+            [new["inject_expectation_id"]],
+        )
+        self.assertEqual(
+            delta.updated[0].inject_expectation_signatures[0].value, "other.exe"
+        )
+        self.assertEqual(delta.removed, [removed])
+        self.assertEqual(len(self.store), 2)
+        self.assertNotIn(self.prevention["inject_expectation_id"], self.store)
+
+
+class TestExpectationStoreExpiry(unittest.TestCase):
+    def setUp(self):
+        self.now = 1_000_000.0
+        self.manager = InjectExpectationManager(
+            OpenBAS(url="http://fake", token="fake")
+        )
+        self.store = ExpectationStore(
+            self.manager, "collector", expiration_time=10, clock=lambda: self.now
+        )
+
+    def sync(self, expectation_dicts):
+        with patch.object(
+            self.manager,
+            "expectations_assets_for_source",
+            return_value=expectation_dicts,
+        ) as expectations_assets_for_source:
+            delta = self.store.sync()
+        expectations_assets_for_source.assert_called_once_with(
+            source_id="collector", expiration_time=10
+        )
+        return delta
+
+    def test_expectations_expire_after_expiration_time_in_order(self):
+        created = dict(
+            create_expectation_dict(),
+            inject_expectation_created_at=datetime.fromtimestamp(
+                self.now - 300, timezone.utc
+            ).isoformat(),
+        )
+        first_seen = create_expectation_dict()
+        self.sync([first_seen, created])
+
+        self.assertEqual(self.store.next_expiration(), self.now + 300)
+
+        self.now += 300
+        evicted = self.store.evict_expired()
+
+        self.assertEqual(
+            [str(e.inject_expectation_id) for e in evicted],
+            [created["inject_expectation_id"]],
+        )
+        self.assertEqual(self.store.next_expiration(), self.now + 300)
+
+    def test_when_expired_expectation_still_returned_do_not_add_it_again(self):
+        expectation = create_expectation_dict()
+        self.sync([expectation])
+
+        self.now += 600
+        delta = self.sync([expectation])
+
+        self.assertEqual(delta.added, [])
+        self.assertEqual(len(delta.removed), 1)
+        self.assertEqual(len(self.store), 0)
+        self.assertFalse(self.sync([expectation]))
+        self.assertIsNone(self.store.next_expiration())
+
+    def test_when_expectation_removed_forget_its_expiry(self):
+        self.sync([create_expectation_dict()])
+
+        self.sync([])
+
+        self.assertIsNone(self.store.next_expiration())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -34,6 +34,25 @@ class TestCollectorDaemon(unittest.TestCase):
 
         self.assertEqual(config.get("collector_period"), DEFAULT_PERIOD_SECONDS)
 
+    @patch("pyobas.daemons.collector_daemon.time.time", return_value=1000.0)
+    def test_schedule_next_poll_shortens_only_next_delay(self, mock_time):
+        config = Configuration(
+            config_hints={
+                "openbas_url": {"data": "fake"},
+                "openbas_token": {"data": "fake"},
+            }
+        )
+        collector = CollectorDaemon(config)
+
+        collector.schedule_next_poll(1030.0)
+        collector.schedule_next_poll(1010.0)
+        collector.schedule_next_poll(None)
+
+        self.assertEqual(collector._next_delay(60), 10.0)
+        self.assertEqual(collector._next_delay(60), 60)
+        collector.schedule_next_poll(2000.0)
+        self.assertEqual(collector._next_delay(60), 60)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,71 @@
+import random
+import unittest
+
+from pyobas.signatures.aho_corasick import (
+    DIRECT_SEARCH_MAX_PATTERNS,
+    AhoCorasick,
+    automaton_for,
+)
+
+
+class TestAhoCorasick(unittest.TestCase):
+    def test_finds_every_occurrence_of_overlapping_patterns(self):
+        automaton = AhoCorasick(["he", "she", "his", "hers"])
+
+        self.assertEqual(
+            sorted(automaton.iter_matches("ushers")),
+            [(4, 0), (4, 1), (6, 3)],
+        )
+        self.assertEqual(automaton.matching_patterns("ushers"), {0, 1, 3})
+
+    def test_search_any(self):
+        automaton = AhoCorasick(["powershell.exe", "whoami"])
+
+        self.assertTrue(automaton.search_any("cmd.exe /c whoami /all"))
+        self.assertFalse(automaton.search_any("cmd.exe /c who"))
+        self.assertFalse(AhoCorasick([]).search_any("whoami"))
+
+    def test_empty_pattern_occurs_in_any_text(self):
+        automaton = AhoCorasick(["", "abc"])
+
+        self.assertTrue(automaton.search_any(""))
+        self.assertEqual(automaton.matching_patterns("xyz"), {0})
+
+    def test_same_result_as_naive_search(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            patterns = [
+                "".join(rng.choices("abc", k=rng.randint(1, 4)))
+                for _ in range(rng.randint(1, 6))
+            ]
+            text = "".join(rng.choices("abc", k=rng.randint(0, 20)))
+            automaton = AhoCorasick(patterns)
+
+            self.assertEqual(
+                automaton.matching_patterns(text),
+                {index for index, pattern in enumerate(patterns) if pattern in text},
+            )
+            self.assertEqual(
+                automaton.search_any(text), any(pattern in text for pattern in patterns)
+            )
+
+    def test_many_patterns_same_result_as_naive_search(self):
+        rng = random.Random(1)
+        patterns = [
+            "".join(rng.choices("abcd", k=rng.randint(2, 6)))
+            for _ in range(DIRECT_SEARCH_MAX_PATTERNS + 50)
+        ]
+        automaton = AhoCorasick(patterns)
+
+        for _ in range(100):
+            text = "".join(rng.choices("abcd", k=rng.randint(0, 8)))
+            self.assertEqual(
+                automaton.search_any(text), any(pattern in text for pattern in patterns)
+            )
+
+    def test_automaton_for_reuses_automatons(self):
+        self.assertIs(automaton_for(("a", "b")), automaton_for(("a", "b")))
+
+
+if __name__ == "__main__":
+    unittest.main()
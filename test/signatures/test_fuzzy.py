@@ -0,0 +1,127 @@
+import unittest
+from unittest.mock import patch
+
+from thefuzz import fuzz
+
+from pyobas.signatures import fuzzy
+from pyobas.signatures.fuzzy import FuzzyIndex
+
+ALERT_VALUES = ["parent.exe", "parent.ex", "powershell.exe -enc abc", "", "cmd.exe"]
+SIGNATURE_VALUES = ["cmd.exe", "parent.exe", "powershell.exe -enc abd"]
+
+
+def brute_force_best_matches(queries, choices, threshold, strict=False):
+    results = []
+    for query in queries:
+        best = None
+        for index, choice in enumerate(choices):
+            score = fuzz.ratio(query, choice)
+            matched = score > threshold if strict else score >= threshold
+            if matched and (best is None or score > best[1]):
+                best = (index, score)
+        results.append(best)
+    return results
+
+
+class TestBestMatches(unittest.TestCase):
+    def assert_same_as_brute_force(self, strict):
+        for threshold in (0, 50, 80, 90, 95, 100):
+            self.assertEqual(
+                fuzzy.best_matches(
+                    ALERT_VALUES, SIGNATURE_VALUES, threshold, strict=strict
+                ),
+                brute_force_best_matches(
+                    ALERT_VALUES, SIGNATURE_VALUES, threshold, strict=strict
+                ),
+            )
+
+    def test_same_results_as_pairwise_ratio(self):
+        self.assert_same_as_brute_force(strict=False)
+
+    def test_when_strict_same_results_as_pairwise_ratio(self):
+        self.assert_same_as_brute_force(strict=True)
+
+    @unittest.skipUnless(fuzzy.numpy, "requires the fuzzy extra (numpy)")
+    def test_with_numpy_score_matrix_computed_with_cdist(self):
+        with patch.object(
+            fuzzy.process, "cdist", wraps=fuzzy.process.cdist
+        ) as cdist, patch.object(fuzzy.process, "extractOne") as extract_one:
+            self.assert_same_as_brute_force(strict=False)
+            self.assert_same_as_brute_force(strict=True)
+
+        self.assertTrue(cdist.called)
+        extract_one.assert_not_called()
+
+    @unittest.skipUnless(fuzzy.numpy, "requires the fuzzy extra (numpy)")
+    def test_with_numpy_and_workers_same_results_as_pairwise_ratio(self):
+        queries = ALERT_VALUES * 20
+        self.assertEqual(
+            fuzzy.best_matches(queries, SIGNATURE_VALUES, 80, workers=2),
+            brute_force_best_matches(queries, SIGNATURE_VALUES, 80),
+        )
+
+    def test_without_numpy_same_results_as_pairwise_ratio(self):
+        with patch.object(fuzzy, "numpy", None):
+            self.assert_same_as_brute_force(strict=False)
+            self.assert_same_as_brute_force(strict=True)
+
+    def test_when_score_rounds_to_even_below_threshold_no_match(self):
+        # raw ratio is 2 * 181 / 400 = 90.5, which rounds to 90
+        tested, reference = "a" * 181 + "b" * 19, "a" * 181 + "c" * 19
+        self.assertEqual(fuzz.ratio(tested, reference), 90)
+
+        self.assertIsNone(fuzzy.match_any([tested], reference, 91))
+        self.assertEqual(fuzzy.match_any([tested], reference, 90), (0, 90))
+
+    def test_match_any_returns_first_best_value(self):
+        self.assertEqual(
+            fuzzy.match_any(["cmd.exe", "parent.ex", "parent.ex"], "parent.exe", 80),
+            (1, 95),
+        )
+        self.assertIsNone(fuzzy.match_any(["parent.exe"], "parent.exe", 100, True))
+
+    def test_when_no_choices_no_match(self):
+        self.assertEqual(fuzzy.best_matches(["a", "b"], [], 0), [None, None])
+        self.assertEqual(fuzzy.best_matches([], ["a"], 0), [])
+
+
+class TestFuzzyIndex(unittest.TestCase):
+    def setUp(self):
+        self.references = SIGNATURE_VALUES + [
+            "parent",
+            "a" * 150,
+            "a" * 149 + "b",
+            "",
+        ]
+        self.index = FuzzyIndex(self.references)
+
+    def test_candidates_include_every_match(self):
+        for tested in ALERT_VALUES + ["a" * 150, "pwsh.exe", "aaa"]:
+            for threshold in (0, 50, 80, 90, 95, 100):
+                for strict in (False, True):
+                    matching = [
+                        index
+                        for index, reference in enumerate(self.references)
+                        if fuzzy.is_match(
+                            fuzz.ratio(tested, reference), threshold, strict
+                        )
+                    ]
+                    candidates = self.index.candidates(tested, threshold, strict)
+                    self.assertTrue(set(matching) <= set(candidates))
+                    self.assertEqual(
+                        self.index.best_match(tested, threshold, strict),
+                        brute_force_best_matches(
+                            [tested], self.references, threshold, strict
+                        )[0],
+                    )
+
+    def test_candidates_skip_references_of_distant_length(self):
+        self.assertEqual(self.index.candidates("parent.exe", 90), [1])
+
+    def test_when_threshold_is_100_short_values_only_match_equal_references(self):
+        self.assertEqual(self.index.candidates("cmd.exe", 100), [0])
+        self.assertEqual(self.index.candidates("a" * 150, 99), [4, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import ipaddress
+import random
+import unittest
+
+from pyobas.signatures.ip import IPNetworkIndex, any_within, parse_network
+
+
+class TestParseNetwork(unittest.TestCase):
+    def test_parses_addresses_and_ranges(self):
+        self.assertEqual(parse_network(" 10.0.0.1 "), ipaddress.ip_network("10.0.0.1"))
+        self.assertEqual(
+            parse_network("10.1.2.3/8"), ipaddress.ip_network("10.0.0.0/8")
+        )
+        self.assertEqual(parse_network("fe80::1/10"), ipaddress.ip_network("fe80::/10"))
+        self.assertIsNone(parse_network("host-a"))
+        self.assertIsNone(parse_network(None))
+
+    def test_any_within(self):
+        self.assertTrue(any_within(["192.168.1.1", "10.2.3.4"], "10.0.0.0/8"))
+        self.assertTrue(any_within(["10.0.0.1"], "10.0.0.1"))
+        self.assertTrue(any_within(["10.1.0.0/16"], "10.0.0.0/8"))
+        self.assertFalse(any_within(["10.0.0.0/8"], "10.1.0.0/16"))
+        self.assertFalse(any_within(["::ffff:10.0.0.1", "host"], "10.0.0.0/8"))
+        self.assertFalse(any_within(["10.0.0.1"], "not an ip"))
+
+
+class TestIPNetworkIndex(unittest.TestCase):
+    def test_returns_networks_containing_address_widest_first(self):
+        index = IPNetworkIndex()
+        for value in ["10.0.0.0/8", "10.1.0.0/16", "10.1.2.3", "192.168.0.0/16"]:
+            index.add(parse_network(value), value)
+        index.add(parse_network("::/0"), "any ipv6")
+
+        self.assertEqual(len(index), 5)
+        self.assertEqual(
+            index.containing(parse_network("10.1.2.3")),
+            ["10.0.0.0/8", "10.1.0.0/16", "10.1.2.3"],
+        )
+        self.assertEqual(index.containing(parse_network("10.2.0.1")), ["10.0.0.0/8"])
+        self.assertEqual(index.containing(parse_network("172.16.0.1")), [])
+        self.assertEqual(index.containing(parse_network("2001:db8::1")), ["any ipv6"])
+
+    def test_same_result_as_testing_each_network(self):
+        rng = random.Random(0)
+        networks = [
+            ipaddress.ip_network(
+                (rng.getrandbits(32), rng.choice([8, 12, 16, 24, 32])), strict=False
+            )
+            for _ in range(300)
+        ]
+        index = IPNetworkIndex()
+        for network in networks:
+            index.add(network, network)
+
+        for network in networks[:50]:
+            address = ipaddress.ip_network(
+                int(network.network_address) + rng.randrange(network.num_addresses)
+            )
+            self.assertEqual(
+                sorted(index.containing(address)),
+                sorted(other for other in networks if address.subnet_of(other)),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
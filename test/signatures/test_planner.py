@@ -0,0 +1,138 @@
+import random
+import unittest
+from unittest.mock import patch
+from uuid import uuid4
+
+from pyobas.apis.inject_expectation.model import DetectionExpectation
+from pyobas.apis.inject_expectation.model.expectation import Expectation
+from pyobas.signatures.planner import MatchPlanner
+from pyobas.signatures.signature_type import SignatureType
+from pyobas.signatures.types import MatchTypes, SignatureTypes
+
+HOSTNAME = SignatureType(
+    label=SignatureTypes.SIG_TYPE_HOSTNAME, match_type=MatchTypes.MATCH_TYPE_SIMPLE
+)
+COMMAND_LINE = SignatureType(
+    label=SignatureTypes.SIG_TYPE_COMMAND_LINE,
+    match_type=MatchTypes.MATCH_TYPE_FUZZY,
+    match_score=80,
+)
+PROCESS_NAME = SignatureType(
+    label=SignatureTypes.SIG_TYPE_PROCESS_NAME,
+    match_type=MatchTypes.MATCH_TYPE_SUBSTRING,
+)
+RELEVANT_SIGNATURE_TYPES = [COMMAND_LINE, PROCESS_NAME, HOSTNAME]
+
+
+def create_expectation(command_line, process_name, hostname):
+    return DetectionExpectation(
+        inject_expectation_id=uuid4(),
+        inject_expectation_signatures=[
+            {"type": "command_line", "value": command_line},
+            {"type": "process_name", "value": process_name},
+            {"type": "hostname", "value": hostname},
+        ],
+    )
+
+
+def create_alert(command_line, process_name=None, hostname=None):
+    alert_data = {"command_line": COMMAND_LINE.make_struct_for_matching(command_line)}
+    if process_name is not None:
+        alert_data["process_name"] = PROCESS_NAME.make_struct_for_matching(process_name)
+    if hostname is not None:
+        alert_data["hostname"] = HOSTNAME.make_struct_for_matching(hostname)
+    return alert_data
+
+
+class TestMatchPlanner(unittest.TestCase):
+    def setUp(self):
+        self.planner = MatchPlanner()
+        self.expectation = create_expectation(
+            "powershell -enc abc", "powershell.exe", "host-a"
+        )
+        self.signatures = self.expectation.inject_expectation_signatures
+
+    def test_cheapest_checks_first_missing_data_before_all(self):
+        ordered = self.planner.order(
+            self.signatures, create_alert("whoami", process_name="cmd.exe")
+        )
+
+        self.assertEqual(
+            [signature.type.value for signature in ordered],
+            ["hostname", "process_name", "command_line"],
+        )
+
+    def test_checks_that_always_pass_move_after_selective_ones(self):
+        alert_data = create_alert("whoami", "cmd.exe", "host-a")
+        for _ in range(20):
+            self.planner.record(self.signatures[2], alert_data["hostname"], True)
+            self.planner.record(self.signatures[1], alert_data["process_name"], False)
+
+        ordered = self.planner.order(self.signatures, alert_data)
+
+        self.assertEqual(
+            [signature.type.value for signature in ordered],
+            ["process_name", "command_line", "hostname"],
+        )
+
+    def test_new_cycle_ages_statistics(self):
+        alert_signature = {"type": "simple", "data": "host-a"}
+        for _ in range(6):
+            self.planner.record(self.signatures[2], alert_signature, True)
+        self.assertEqual(self.planner.pass_rate("hostname", "simple"), 7 / 8)
+
+        self.planner.new_cycle()
+
+        self.assertEqual(self.planner.pass_rate("hostname", "simple"), 4 / 5)
+
+    def test_match_alert_same_result_with_fewer_fuzzy_comparisons(self):
+        rng = random.Random(0)
+        expectations = [
+            create_expectation(
+                rng.choice(["powershell -enc abc", "cmd /c whoami"]),
+                rng.choice(["powershell.exe", "cmd.exe"]),
+                f"host-{rng.randrange(20)}",
+            )
+            for _ in range(50)
+        ]
+        alerts = [
+            create_alert(
+                rng.choice(["powershell -enc abc", "cmd /c whoami", "net user"]),
+                rng.choice(["powershell.exe", "cmd.exe", None]),
+                f"host-{rng.randrange(20)}",
+            )
+            for _ in range(20)
+        ]
+
+        fuzzy_scores = []
+        match_fuzzy = Expectation.match_fuzzy
+
+        def count_fuzzy(tested, reference, threshold):
+            # simple checks are fuzzy matches with a threshold of 100
+            if threshold != 100:
+                fuzzy_scores.append(threshold)
+            return match_fuzzy(tested, reference, threshold)
+
+        with patch.object(Expectation, "match_fuzzy", side_effect=count_fuzzy):
+            without_planner = [
+                expectation.match_alert(RELEVANT_SIGNATURE_TYPES, alert_data)
+                for alert_data in alerts
+                for expectation in expectations
+            ]
+            fuzzy_without_planner = len(fuzzy_scores)
+            fuzzy_scores.clear()
+            with_planner = [
+                expectation.match_alert(
+                    RELEVANT_SIGNATURE_TYPES, alert_data, self.planner
+                )
+                for alert_data in alerts
+                for expectation in expectations
+            ]
+
+        self.assertEqual(with_planner, without_planner)
+        self.assertEqual(fuzzy_without_planner, len(alerts) * len(expectations))
+        self.assertLess(len(fuzzy_scores), fuzzy_without_planner / 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import random
+import re
+import unittest
+
+from pyobas.signatures.regex import RegexSet, compile_pattern, regex_set_for
+
+
+class TestRegexSet(unittest.TestCase):
+    def test_finds_all_patterns_occurring_in_text(self):
+        regex_set = RegexSet([r"whoami", r"^cmd\.exe", r"/c\s+\w+$", r"net user"])
+
+        self.assertEqual(regex_set.matching("cmd.exe /c whoami"), {0, 1, 2})
+        self.assertTrue(regex_set.search_any("net user admin"))
+        self.assertFalse(regex_set.search_any("powershell.exe"))
+
+    def test_overlapping_patterns_are_all_found(self):
+        regex_set = RegexSet([r"abc", r"bc", r"c"])
+
+        self.assertEqual(regex_set.matching("xabcx"), {0, 1, 2})
+
+    def test_patterns_that_cannot_be_combined_are_searched_separately(self):
+        regex_set = RegexSet(
+            [r"(?i)WHOAMI", r"(\w)\1", r"(?P<name>x)(?P=name)", r"[invalid", r"ami"]
+        )
+
+        self.assertEqual(len(regex_set._separate), 3)
+        self.assertEqual(regex_set.matching("whoami"), {0, 4})
+        self.assertEqual(regex_set.matching("xx"), {1, 2})
+        self.assertEqual(regex_set.matching("[invalid"), set())
+
+    def test_same_result_as_searching_each_pattern(self):
+        rng = random.Random(0)
+        atoms = ["a", "b", "ab", "a+", "b?", "[ab]", ".", "^a", "b$", "(a|b)b"]
+        for _ in range(200):
+            patterns = [
+                "".join(rng.choices(atoms, k=rng.randint(1, 3)))
+                for _ in range(rng.randint(1, 5))
+            ]
+            text = "".join(rng.choices("abc", k=rng.randint(0, 12)))
+
+            self.assertEqual(
+                RegexSet(patterns).matching(text),
+                {
+                    index
+                    for index, pattern in enumerate(patterns)
+                    if re.search(pattern, text)
+                },
+            )
+
+    def test_compiled_patterns_and_sets_are_cached(self):
+        self.assertIs(compile_pattern("who.mi"), compile_pattern("who.mi"))
+        self.assertIsNone(compile_pattern("("))
+        self.assertIs(regex_set_for(("a", "b")), regex_set_for(("a", "b")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -16,6 +16,9 @@ class TestSignatureMatch(unittest.TestCase):
         score = None
         SignatureMatch(match_type=MatchTypes.MATCH_TYPE_SIMPLE, match_score=score)
 
+    def test_substring_match_with_null_score_does_not_throw(self):
+        SignatureMatch(match_type=MatchTypes.MATCH_TYPE_SUBSTRING, match_score=None)
+
     def test_fuzzy_match_with_0_score_does_not_throw(self):
         score = 0
         SignatureMatch(match_type=MatchTypes.MATCH_TYPE_FUZZY, match_score=score)
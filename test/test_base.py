@@ -0,0 +1,379 @@
+import copy
+import gc
+import json
+import pickle
+import unittest
+from unittest.mock import patch
+
+from pyobas import OpenBAS
+from pyobas.apis import Team, TeamManager
+from pyobas.base import CompactRESTObject, RESTManager, RESTObject
+from pyobas.exceptions import OpenBASError
+from pyobas.mixins import UpdateMethod
+
+
+class Child(RESTObject):
+    _id_attr = "child_id"
+
+
+class ChildManager(RESTManager):
+    _path = "/parents/{parent_id}/children"
+    _obj_cls = Child
+    _from_parent_attrs = {"parent_id": "parent_id"}
+
+
+class Parent(RESTObject):
+    _id_attr = "parent_id"
+    children: ChildManager
+
+
+class ParentManager(RESTManager):
+    _path = "/parents"
+    _obj_cls = Parent
+
+
+class TestRESTObject(unittest.TestCase):
+    def setUp(self):
+        self.openbas = OpenBAS(url="http://fake", token="fake")
+
+    def test_nested_managers_are_created_on_first_access(self):
+        parent = Parent(ParentManager(self.openbas), {"parent_id": "p1"})
+
+        self.assertNotIn("children", parent.__dict__)
+        children = parent.children
+
+        self.assertIsInstance(children, ChildManager)
+        self.assertIs(parent.children, children)
+        self.assertEqual(children.path, "/parents/p1/children")
+        self.assertIn("children", dir(parent))
+
+    def test_managers_plan_is_computed_once_per_class(self):
+        self.assertEqual(Parent._get_managers_plan(), {"children": ChildManager})
+        self.assertIs(Parent._get_managers_plan(), Parent._get_managers_plan())
+        self.assertEqual(Child._get_managers_plan(), {})
+
+    def test_reading_list_attribute_does_not_mark_it_updated(self):
+        tags = ["a", "b"]
+        team = Team(TeamManager(self.openbas), {"team_id": "1", "team_tags": tags})
+
+        self.assertEqual(team.team_tags, ["a", "b"])
+        self.assertEqual(list(team.team_tags), ["a", "b"])
+        self.assertEqual(team._updated_attrs, {})
+
+    def test_mutating_list_attribute_copies_it_and_tracks_change(self):
+        tags = ["a"]
+        team = Team(TeamManager(self.openbas), {"team_id": "1", "team_tags": tags})
+
+        team_tags = team.team_tags
+        team_tags.append("b")
+        team_tags.append("c")
+
+        self.assertEqual(tags, ["a"])
+        self.assertEqual(team._updated_attrs, {"team_tags": ["a", "b", "c"]})
+        self.assertEqual(team.asdict()["team_tags"], ["a", "b", "c"])
+
+    def test_reading_list_attribute_does_not_copy_it(self):
+        tags = ["a", "b"]
+        team = Team(TeamManager(self.openbas), {"team_id": "1", "team_tags": tags})
+
+        view = team.team_tags
+        tags.append("c")
+
+        self.assertIs(team.team_tags, view)
+        self.assertEqual(view, ["a", "b", "c"])
+        self.assertEqual(team._updated_attrs, {})
+
+    def test_list_attribute_mutated_through_two_handles_keeps_both_changes(self):
+        team = Team(TeamManager(self.openbas), {"team_id": "1", "team_tags": []})
+
+        first = team.team_tags
+        second = team.team_tags
+        first.append("A")
+        second.append("B")
+
+        self.assertEqual(team.team_tags, ["A", "B"])
+        self.assertEqual(team._attrs["team_tags"], [])
+        self.assertEqual(team.asdict()["team_tags"], ["A", "B"])
+
+    def test_list_attribute_copies_are_plain_lists(self):
+        team = Team(TeamManager(self.openbas), {"team_id": "1", "team_tags": ["a"]})
+
+        self.assertEqual(json.dumps({"tags": team.team_tags.copy()}), '{"tags": ["a"]}')
+        self.assertEqual(team.team_tags + ["b"], ["a", "b"])
+        self.assertIs(type(copy.deepcopy(team.team_tags)), list)
+        self.assertIs(type(pickle.loads(pickle.dumps(team.team_tags))), list)
+        self.assertEqual(team._updated_attrs, {})
+
+    def test_list_attribute_assigned_from_another_object_is_copied(self):
+        source = Team(TeamManager(self.openbas), {"team_id": "1", "team_tags": ["a"]})
+        team = Team(TeamManager(self.openbas), {"team_id": "2", "team_tags": []})
+
+        team.team_tags = source.team_tags
+        team.team_tags.append("b")
+
+        self.assertEqual(source.team_tags, ["a"])
+        self.assertEqual(team.to_json(), '{"team_id": "2", "team_tags": ["a", "b"]}')
+
+    def test_augmented_assignment_of_list_attribute_is_tracked(self):
+        team = Team(TeamManager(self.openbas), {"team_id": "1", "team_tags": ["a"]})
+
+        team.team_tags += ["b"]
+
+        self.assertEqual(team._attrs["team_tags"], ["a"])
+        self.assertEqual(team.dirty_fields, ["team_tags"])
+        self.assertEqual(team.to_json(), '{"team_id": "1", "team_tags": ["a", "b"]}')
+
+    def test_asdict_view_is_read_only_and_follows_changes(self):
+        team = Team(TeamManager(self.openbas), {"team_id": "1", "team_name": "a"})
+
+        view = team.asdict_view()
+        team.team_name = "b"
+
+        self.assertEqual(dict(view), {"team_id": "1", "team_name": "b"})
+        with self.assertRaises(TypeError):
+            view["team_name"] = "c"
+        self.assertEqual(team.to_json(), '{"team_id": "1", "team_name": "b"}')
+
+
+class TestRESTObjectSerialization(unittest.TestCase):
+    def setUp(self):
+        self.openbas = OpenBAS(url="http://fake", token="fake")
+        self.manager = ParentManager(self.openbas)
+
+    def test_to_bytes_does_not_serialize_manager(self):
+        parent = Parent(self.manager, {"parent_id": "p1"})
+        parent.parent_name = "a"
+
+        data = parent.to_bytes()
+
+        self.assertNotIn(b"OpenBAS", data)
+        loaded = RESTObject.from_bytes(data)
+        self.assertIs(type(loaded), Parent)
+        self.assertIsNone(loaded.manager)
+        self.assertEqual(loaded.asdict(), {"parent_id": "p1", "parent_name": "a"})
+        self.assertEqual(loaded.dirty_fields, ["parent_name"])
+        with self.assertRaises(OpenBASError):
+            loaded.children
+
+    def test_from_bytes_with_manager_rebinds_nested_managers_lazily(self):
+        parent = Parent(self.manager, {"parent_id": "p1"})
+
+        loaded = RESTObject.from_bytes(parent.to_bytes(), manager=self.manager)
+
+        self.assertIs(loaded.manager, self.manager)
+        self.assertEqual(loaded.children.path, "/parents/p1/children")
+
+    def test_pickle_uses_compact_serialization(self):
+        parent = Parent(self.manager, {"parent_id": "p1"})
+
+        loaded = pickle.loads(pickle.dumps(parent))
+
+        self.assertEqual(loaded, parent)
+        self.assertIsNone(loaded.manager)
+
+    def test_copies_keep_the_manager(self):
+        parent = Parent(self.manager, {"parent_id": "p1", "tags": ["a"]})
+        parent.parent_name = "a"
+        parent.children
+
+        shallow = copy.copy(parent)
+        deep = copy.deepcopy(parent)
+
+        for copied in (shallow, deep):
+            self.assertIs(copied.manager, self.manager)
+            self.assertEqual(copied.asdict(), parent.asdict())
+            self.assertEqual(copied.dirty_fields, ["parent_name"])
+        self.assertIs(shallow._attrs, parent._attrs)
+        self.assertIsNot(deep._attrs["tags"], parent._attrs["tags"])
+        self.assertIs(deep.children._parent, deep)
+
+        compact = Parent._get_compact_cls()(self.manager, {"parent_id": "p1"})
+        self.assertIs(copy.copy(compact).manager, self.manager)
+        self.assertEqual(copy.deepcopy(compact).parent_id, "p1")
+
+    def test_copied_object_can_be_saved(self):
+        team = Team(TeamManager(self.openbas), {"team_id": "1", "team_name": "a"})
+
+        copied = copy.deepcopy(team)
+        copied.team_name = "b"
+        with patch.object(self.openbas, "http_put", return_value={}) as http_put:
+            copied.save()
+
+        http_put.assert_called_once_with(
+            "/teams/1", post_data={"team_id": "1", "team_name": "b"}
+        )
+
+
+class TestRESTObjectSave(unittest.TestCase):
+    def setUp(self):
+        self.openbas = OpenBAS(url="http://fake", token="fake")
+        self.manager = TeamManager(self.openbas)
+        self.team = Team(
+            self.manager, {"team_id": "1", "team_name": "a", "team_tags": ["x"]}
+        )
+
+    def test_when_nothing_changed_save_sends_no_request(self):
+        self.team.team_name = "a"
+        self.team.team_tags.append("y")
+        self.team.team_tags.remove("y")
+
+        with patch.object(self.openbas, "http_put") as http_put:
+            self.assertIsNone(self.team.save())
+
+        self.assertEqual(self.team.dirty_fields, [])
+        http_put.assert_not_called()
+
+    def test_when_put_save_sends_merged_data(self):
+        self.team.team_name = "b"
+        server_data = {"team_id": "1", "team_name": "b", "team_tags": ["x"]}
+
+        with patch.object(
+            self.openbas, "http_put", return_value=server_data
+        ) as http_put:
+            self.team.save()
+
+        http_put.assert_called_once_with("/teams/1", post_data=server_data)
+        self.assertEqual(self.team.dirty_fields, [])
+        self.assertEqual(self.team._attrs, server_data)
+
+    def test_when_list_attribute_extended_save_sends_serializable_data(self):
+        self.team.team_tags += ["y"]
+
+        with patch.object(
+            self.openbas,
+            "http_put",
+            side_effect=lambda path, post_data: json.loads(json.dumps(post_data)),
+        ) as http_put:
+            self.team.save()
+
+        http_put.assert_called_once_with(
+            "/teams/1",
+            post_data={"team_id": "1", "team_name": "a", "team_tags": ["x", "y"]},
+        )
+        self.assertEqual(self.team.team_tags, ["x", "y"])
+        self.assertEqual(self.team.dirty_fields, [])
+
+    def test_when_patch_save_sends_changed_fields_only(self):
+        self.manager._update_method = UpdateMethod.PATCH
+        self.team.team_tags.append("y")
+
+        with patch.object(self.openbas, "http_patch", return_value={}) as http_patch:
+            self.team.save()
+
+        http_patch.assert_called_once_with(
+            "/teams/1", post_data={"team_tags": ["x", "y"]}
+        )
+        self.assertEqual(self.team.team_tags, ["x", "y"])
+        self.assertEqual(self.team.dirty_fields, [])
+
+    def test_when_manager_cannot_update_save_raises(self):
+        child = Child(RESTManager(self.openbas), {"child_id": "1"})
+        child.name = "a"
+
+        with self.assertRaises(OpenBASError):
+            child.save()
+
+
+class TestRESTManagerIdentityMap(unittest.TestCase):
+    def setUp(self):
+        self.openbas = OpenBAS(url="http://fake", token="fake")
+        self.manager = TeamManager(self.openbas)
+
+    def test_when_disabled_build_new_instances(self):
+        first = self.manager._build_object({"team_id": "1"})
+        second = self.manager._build_object({"team_id": "1"})
+
+        self.assertIsNot(first, second)
+
+    def test_when_enabled_refresh_and_return_same_instance(self):
+        self.manager.enable_identity_map()
+        with patch.object(
+            self.openbas, "http_list", return_value=[{"team_id": "1", "team_name": "a"}]
+        ):
+            first = self.manager.list()[0]
+        with patch.object(
+            self.openbas, "http_list", return_value=[{"team_id": "1", "team_name": "b"}]
+        ):
+            second = self.manager.list()[0]
+
+        self.assertIs(first, second)
+        self.assertEqual(first.team_name, "b")
+
+    def test_when_refreshed_from_list_keep_fields_of_full_fetch(self):
+        self.manager.enable_identity_map()
+        full = self.manager._build_object(
+            {"team_id": "1", "team_name": "a", "team_description": "full"}
+        )
+        with patch.object(
+            self.openbas, "http_list", return_value=[{"team_id": "1", "team_name": "b"}]
+        ):
+            listed = self.manager.list()[0]
+
+        self.assertIs(listed, full)
+        self.assertEqual(full.team_name, "b")
+        self.assertEqual(full.team_description, "full")
+        self.assertFalse(full._created_from_list)
+
+    def test_when_refreshed_keep_pending_local_changes(self):
+        self.manager.enable_identity_map()
+        team = self.manager._build_object({"team_id": "1", "team_name": "a"})
+        team.team_name = "local"
+        with patch.object(
+            self.openbas,
+            "http_list",
+            return_value=[{"team_id": "1", "team_name": "server", "team_tags": []}],
+        ):
+            self.manager.list()
+        self.manager._build_object({"team_id": "1", "team_name": "server"})
+
+        self.assertEqual(team.team_name, "local")
+        self.assertEqual(team.dirty_fields, ["team_name"])
+        self.assertEqual(team._attrs, {"team_id": "1", "team_name": "server"})
+
+    def test_identity_map_does_not_keep_objects_alive(self):
+        self.manager.enable_identity_map()
+        self.manager._build_object({"team_id": "1"})
+        gc.collect()
+
+        self.assertEqual(len(self.manager._identity_map), 0)
+
+    def test_compact_objects_bypass_identity_map(self):
+        self.manager.enable_identity_map()
+        team = self.manager._build_object(
+            {"team_id": "1"}, obj_cls=Team._get_compact_cls()
+        )
+
+        self.assertIsInstance(team, CompactRESTObject)
+        self.assertEqual(len(self.manager._identity_map), 0)
+
+
+class TestCompactRESTObject(unittest.TestCase):
+    def setUp(self):
+        self.openbas = OpenBAS(url="http://fake", token="fake")
+        self.manager = TeamManager(self.openbas)
+
+    def test_compact_object_has_no_dict(self):
+        team = Team._get_compact_cls()(self.manager, {"team_id": "1", "team_name": "a"})
+
+        self.assertIsInstance(team, CompactRESTObject)
+        self.assertFalse(hasattr(team, "__dict__"))
+        self.assertEqual(team.get_id(), "1")
+        self.assertEqual(team.team_name, "a")
+        self.assertIs(Team._get_compact_cls(), type(team))
+        with self.assertRaises(AttributeError):
+            team.team_name = "b"
+        with self.assertRaises(AttributeError):
+            team.missing
+
+    def test_compact_object_can_be_pickled(self):
+        team = Team._get_compact_cls()(self.manager, {"team_id": "1"})
+
+        loaded = type(team).from_bytes(team.to_bytes(), manager=self.manager)
+
+        self.assertIs(type(loaded), type(team))
+        self.assertIs(loaded.manager, self.manager)
+        self.assertEqual(loaded.asdict(), {"team_id": "1"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+
+from pyobas import OpenBAS
+from pyobas.client import OpenBASList
+from pyobas.exceptions import OpenBASHttpError
+
+
+def create_mock_response(data, headers=None, next_url=None):
+    response = MagicMock()
+    response.json.return_value = data
+    response.headers = headers or {}
+    response.links = {"next": {"url": next_url}} if next_url else {}
+    return response
+
+
+class TestOpenBASList(unittest.TestCase):
+    def setUp(self):
+        self.openbas = OpenBAS(url="http://fake", token="fake")
+
+    def test_when_next_link_follow_link(self):
+        responses = [
+            create_mock_response([{"id": 1}], next_url="http://fake/api/items?page=2"),
+            create_mock_response([{"id": 2}]),
+        ]
+        with patch.object(
+            self.openbas, "http_request", side_effect=responses
+        ) as http_request:
+            items = list(OpenBASList(self.openbas, "http://fake/api/items", {}))
+
+        self.assertEqual(items, [{"id": 1}, {"id": 2}])
+        self.assertEqual(
+            http_request.call_args_list[1].args,
+            ("get", "http://fake/api/items?page=2"),
+        )
+
+    def test_when_cursor_header_follow_cursor_instead_of_page(self):
+        responses = [
+            create_mock_response(
+                [{"id": 1}],
+                headers={"X-Next-Cursor": "abc"},
+                next_url="http://fake/api/items?page=2",
+            ),
+            create_mock_response([{"id": 2}]),
+        ]
+        with patch.object(
+            self.openbas, "http_request", side_effect=responses
+        ) as http_request:
+            bas_list = OpenBASList(
+                self.openbas, "http://fake/api/items", {"q": "x"}, page=1, per_page=1
+            )
+            self.assertEqual(bas_list.next_cursor, "abc")
+            items = list(bas_list)
+
+        self.assertEqual(items, [{"id": 1}, {"id": 2}])
+        second_call = http_request.call_args_list[1]
+        self.assertEqual(second_call.args, ("get", "http://fake/api/items"))
+        self.assertEqual(second_call.kwargs["query_data"], {"q": "x", "cursor": "abc"})
+        self.assertEqual(second_call.kwargs["per_page"], 1)
+        self.assertNotIn("page", second_call.kwargs)
+        self.assertIsNone(bas_list.next_cursor)
+
+    def test_when_fields_yield_projected_records(self):
+        responses = [
+            create_mock_response(
+                [{"id": 1, "name": "a", "big": "x" * 100}, {"id": 2}],
+            ),
+        ]
+        with patch.object(self.openbas, "http_request", side_effect=responses):
+            items = list(
+                OpenBASList(
+                    self.openbas, "http://fake/api/items", {}, fields=["id", "name"]
+                )
+            )
+
+        self.assertEqual([tuple(item) for item in items], [(1, "a"), (2, None)])
+        self.assertEqual(items[0].name, "a")
+        self.assertFalse(hasattr(items[0], "__dict__"))
+
+    def test_when_resume_from_checkpoint_continue_from_saved_position(self):
+        first_page = [{"id": 1}, {"id": 2}]
+        responses = [
+            create_mock_response(first_page, next_url="http://fake/api/items?page=2"),
+        ]
+        with patch.object(self.openbas, "http_request", side_effect=responses):
+            bas_list = OpenBASList(self.openbas, "http://fake/api/items", {}, page=1)
+            self.assertEqual(bas_list.next(), {"id": 1})
+            checkpoint = json.loads(json.dumps(bas_list.checkpoint()))
+
+        responses = [
+            create_mock_response(first_page, next_url="http://fake/api/items?page=2"),
+            create_mock_response([{"id": 3}]),
+        ]
+        with patch.object(
+            self.openbas, "http_request", side_effect=responses
+        ) as http_request:
+            items = list(OpenBASList(self.openbas, "", {}, resume_from=checkpoint))
+
+        self.assertEqual(items, [{"id": 2}, {"id": 3}])
+        self.assertEqual(
+            http_request.call_args_list[0].args, ("get", "http://fake/api/items")
+        )
+        self.assertEqual(http_request.call_args_list[0].kwargs["page"], 1)
+
+    @patch("pyobas.client.time.sleep")
+    def test_when_transient_error_retry_page(self, mock_sleep):
+        responses = [
+            OpenBASHttpError("unavailable", response_code=503),
+            create_mock_response([{"id": 1}]),
+        ]
+        with patch.object(self.openbas, "http_request", side_effect=responses):
+            items = list(
+                OpenBASList(self.openbas, "http://fake/api/items", {}, max_retries=1)
+            )
+
+        self.assertEqual(items, [{"id": 1}])
+        mock_sleep.assert_called_once()
+
+    @patch("pyobas.client.time.sleep")
+    def test_when_client_error_do_not_retry_page(self, mock_sleep):
+        responses = [OpenBASHttpError("bad request", response_code=400)]
+        with patch.object(self.openbas, "http_request", side_effect=responses):
+            with self.assertRaises(OpenBASHttpError):
+                OpenBASList(self.openbas, "http://fake/api/items", {}, max_retries=3)
+
+        mock_sleep.assert_not_called()
+
+    @patch("pyobas.client.time.sleep")
+    def test_when_no_max_retries_retry_page_by_default(self, mock_sleep):
+        responses = [
+            OpenBASHttpError("unavailable", response_code=503),
+            OpenBASHttpError("unavailable", response_code=502),
+            create_mock_response([{"id": 1}]),
+        ]
+        with patch.object(self.openbas, "http_request", side_effect=responses):
+            items = list(OpenBASList(self.openbas, "http://fake/api/items", {}))
+
+        self.assertEqual(items, [{"id": 1}])
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    def test_checkpoint_saves_max_retries_and_is_a_copy(self):
+        response = create_mock_response([{"id": 1}])
+        with patch.object(self.openbas, "http_request", return_value=response):
+            bas_list = OpenBASList(
+                self.openbas, "http://fake/api/items", {"q": "x"}, max_retries=5
+            )
+            checkpoint = bas_list.checkpoint()
+            checkpoint["kwargs"]["page"] = 10
+            checkpoint["query_data"]["q"] = "y"
+
+            self.assertEqual(bas_list.checkpoint()["query_data"], {"q": "x"})
+            self.assertNotIn("page", bas_list.checkpoint()["kwargs"])
+            self.assertEqual(checkpoint["max_retries"], 5)
+            resumed = OpenBASList(self.openbas, "", {}, resume_from=checkpoint)
+
+        self.assertEqual(resumed._max_retries, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
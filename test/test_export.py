@@ -0,0 +1,129 @@
+import io
+import json
+import unittest
+from unittest.mock import patch
+
+from pyobas import OpenBAS
+from pyobas.apis import Team, TeamManager
+from pyobas.export import ColumnarBuffer, to_columns, write_chunks
+
+ITEMS = [
+    {"id": 1, "name": "host-a", "score": 1, "active": True, "tags": ["x"]},
+    {"id": 2, "name": "host-b", "score": 2.5, "active": False},
+    {"id": 3, "name": "host-a", "score": None, "active": True, "tags": []},
+]
+FIELDS = ["id", "name", "score", "active", "tags"]
+
+
+class TestColumnarBuffer(unittest.TestCase):
+    def test_columns_are_typed_and_dictionary_encoded(self):
+        buffer = to_columns(ITEMS, FIELDS)
+
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer["id"].kind, "int")
+        self.assertEqual(buffer["id"].values.typecode, "q")
+        self.assertEqual(buffer["score"].kind, "float")
+        self.assertEqual(buffer["active"].kind, "bool")
+        self.assertEqual(buffer["name"].kind, "str")
+        self.assertEqual(buffer["name"].categories, ["host-a", "host-b"])
+        self.assertEqual(list(buffer["name"].values), [0, 1, 0])
+        self.assertEqual(
+            list(buffer.rows()),
+            [
+                [1, "host-a", 1.0, True, '["x"]'],
+                [2, "host-b", 2.5, False, None],
+                [3, "host-a", None, True, "[]"],
+            ],
+        )
+
+    def test_when_types_mismatch_promote_to_str(self):
+        buffer = ColumnarBuffer(["value"])
+        buffer.extend([{"value": None}, {"value": 1}, {"value": "a"}, {"value": 2}])
+
+        self.assertEqual(buffer["value"].kind, "str")
+        self.assertEqual(list(buffer.rows()), [[None], ["1"], ["a"], ["2"]])
+
+    def test_when_integer_overflow_promote_to_str(self):
+        buffer = to_columns([{"value": 1}, {"value": 2**70}], ["value"])
+
+        self.assertEqual(list(buffer.rows()), [["1"], [str(2**70)]])
+
+    def test_when_items_are_records_read_attributes(self):
+        class Record:
+            id = 7
+
+        buffer = to_columns([Record()], ["id", "missing"])
+
+        self.assertEqual(list(buffer.rows()), [[7, None]])
+
+    def test_when_items_are_rest_objects_encode_list_attributes(self):
+        team = Team(TeamManager(OpenBAS(url="http://fake", token="fake")), ITEMS[0])
+
+        buffer = to_columns([team], ["id", "tags"])
+
+        self.assertEqual(list(buffer.rows()), [[1, '["x"]']])
+
+
+class TestWriteChunks(unittest.TestCase):
+    def test_write_csv_and_jsonl_in_chunks(self):
+        csv_file, jsonl_file = io.StringIO(), io.StringIO()
+
+        written = write_chunks(
+            ITEMS,
+            ["id", "name"],
+            csv_file=csv_file,
+            jsonl_file=jsonl_file,
+            chunk_size=2,
+        )
+
+        self.assertEqual(written, 3)
+        self.assertEqual(
+            csv_file.getvalue().splitlines(),
+            ["id,name", "1,host-a", "2,host-b", "3,host-a"],
+        )
+        self.assertEqual(
+            [json.loads(line) for line in jsonl_file.getvalue().splitlines()],
+            [
+                {"id": 1, "name": "host-a"},
+                {"id": 2, "name": "host-b"},
+                {"id": 3, "name": "host-a"},
+            ],
+        )
+
+    def test_string_dictionary_is_bounded_by_chunk_size(self):
+        csv_file = io.StringIO()
+        dictionary_sizes = []
+        write_csv = ColumnarBuffer.write_csv
+
+        def record_dictionary_size(buffer, file, header=True):
+            dictionary_sizes.append(len(buffer["id"].categories))
+            write_csv(buffer, file, header=header)
+
+        with patch.object(
+            ColumnarBuffer,
+            "write_csv",
+            autospec=True,
+            side_effect=record_dictionary_size,
+        ):
+            written = write_chunks(
+                ({"id": f"id-{index}"} for index in range(1000)),
+                ["id"],
+                csv_file=csv_file,
+                chunk_size=100,
+            )
+
+        self.assertEqual(written, 1000)
+        self.assertEqual(dictionary_sizes, [100] * 10)
+        self.assertEqual(csv_file.getvalue().splitlines()[-1], "id-999")
+
+    def test_when_no_items_still_write_csv_header(self):
+        csv_file = io.StringIO()
+
+        written = write_chunks([], ["id"], csv_file=csv_file)
+
+        self.assertEqual(written, 0)
+        self.assertEqual(csv_file.getvalue().splitlines(), ["id"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import base64
+import unittest
+from unittest.mock import MagicMock, patch
+
+from pyobas.helpers import OpenBASDetectionHelper
+from pyobas.seen_alerts import SeenAlertFilter
+
+
+def create_alert_data(command_lines):
+    return {"command_line": {"type": "simple", "data": command_lines}}
+
+
+class TestOpenBASDetectionHelper(unittest.TestCase):
+    def setUp(self):
+        self.helper = OpenBASDetectionHelper(MagicMock(), ["command_line"])
+
+    def test_when_base64_command_line_match_decoded_value(self):
+        signatures = [
+            {
+                "type": "command_line",
+                "value": base64.b64encode(b"  PowerShell -enc ABC ").decode(),
+            }
+        ]
+
+        self.assertTrue(
+            self.helper.match_alert_elements(
+                signatures, create_alert_data(["powershell -ENC abc"])
+            )
+        )
+        self.assertFalse(
+            self.helper.match_alert_elements(
+                signatures, create_alert_data(["cmd.exe /c whoami"])
+            )
+        )
+
+    def test_signature_decoded_once_per_unique_value_until_new_cycle(self):
+        signatures = [{"type": "command_line", "value": "whoami"}] * 3
+        alert_data = create_alert_data(["WHOAMI "])
+
+        with patch.object(
+            self.helper, "_decode_value", wraps=self.helper._decode_value
+        ) as decode_value:
+            for _ in range(5):
+                self.assertTrue(
+                    self.helper.match_alert_elements(signatures, alert_data)
+                )
+            self.assertEqual(decode_value.call_count, 1)
+
+            self.helper.new_cycle()
+            self.helper.match_alert_elements(signatures, alert_data)
+            self.assertEqual(decode_value.call_count, 2)
+
+    def test_command_line_signature_matches_any_alert_value_type(self):
+        signatures = [{"type": "command_line", "value": "cmd.exe /c whoami /all"}]
+        alert_data = {
+            "command_line": {"type": "simple", "data": ["WHOAMI"]},
+            "process_name": {"type": "simple", "data": ["powershell.exe"]},
+        }
+
+        # the command line matches even though the last value type does not
+        self.assertTrue(self.helper.match_alert_elements(signatures, alert_data))
+        self.assertFalse(
+            self.helper.match_alert_elements(
+                signatures, create_alert_data(["powershell.exe"])
+            )
+        )
+
+    def test_substring_signature_matches_when_containing_alert_value(self):
+        helper = OpenBASDetectionHelper(MagicMock(), ["parent_process_name"])
+        signatures = [
+            {"type": "parent_process_name", "value": "C:\\Windows\\Explorer.EXE"}
+        ]
+
+        self.assertTrue(
+            helper.match_alert_elements(
+                signatures,
+                {"parent_process_name": {"type": "substring", "data": "explorer.exe"}},
+            )
+        )
+        self.assertFalse(
+            helper.match_alert_elements(
+                signatures,
+                {"parent_process_name": {"type": "substring", "data": ["cmd.exe"]}},
+            )
+        )
+
+    def test_regex_signature_matches_when_found_in_alert_value(self):
+        helper = OpenBASDetectionHelper(MagicMock(), ["hostname"])
+        signatures = [{"type": "hostname", "value": r"^host-\d+$"}]
+
+        self.assertTrue(
+            helper.match_alert_elements(
+                signatures, {"hostname": {"type": "regex", "data": ["web", "host-1"]}}
+            )
+        )
+        self.assertFalse(
+            helper.match_alert_elements(
+                [{"type": "hostname", "value": "("}],
+                {"hostname": {"type": "regex", "data": "("}},
+            )
+        )
+
+    def test_ip_signature_matches_when_alert_address_in_range(self):
+        helper = OpenBASDetectionHelper(MagicMock(), ["ipv6_address"])
+        signatures = [{"type": "ipv6_address", "value": "2001:db8::/32"}]
+
+        self.assertTrue(
+            helper.match_alert_elements(
+                signatures, {"ipv6_address": {"type": "ip", "data": ["2001:db8::1"]}}
+            )
+        )
+        self.assertFalse(
+            helper.match_alert_elements(
+                signatures, {"ipv6_address": {"type": "ip", "data": "2001:db9::1"}}
+            )
+        )
+
+    def test_is_new_alert_with_seen_alerts_filter(self):
+        self.assertTrue(self.helper.is_new_alert("alert"))
+        self.assertTrue(self.helper.is_new_alert("alert"))
+
+        helper = OpenBASDetectionHelper(
+            MagicMock(), ["command_line"], seen_alerts=SeenAlertFilter()
+        )
+
+        self.assertTrue(helper.is_new_alert("alert"))
+        self.assertFalse(helper.is_new_alert("alert"))
+
+
+if __name__ == "__main__":
+    unittest.main()
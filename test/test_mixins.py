@@ -0,0 +1,104 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from pyobas import OpenBAS
+from pyobas.apis import CollectorManager, Team, TeamManager
+from pyobas.exceptions import OpenBASHttpError
+
+
+class TestListMixin(unittest.TestCase):
+    def setUp(self):
+        self.openbas = OpenBAS(url="http://fake", token="fake")
+        self.manager = TeamManager(self.openbas)
+
+    def test_when_list_build_rest_objects(self):
+        with patch.object(
+            self.openbas, "http_list", return_value=[{"team_id": "1"}]
+        ) as http_list:
+            teams = self.manager.list()
+
+        http_list.assert_called_once_with("/teams")
+        self.assertIsInstance(teams[0], Team)
+        self.assertEqual(teams[0].get_id(), "1")
+
+    def test_when_list_raw_return_server_dicts(self):
+        with patch.object(self.openbas, "http_list", return_value=[{"team_id": "1"}]):
+            teams = self.manager.list(raw=True)
+
+        self.assertEqual(teams, [{"team_id": "1"}])
+
+    def test_iter_raw_requests_a_generator(self):
+        with patch.object(self.openbas, "http_list") as http_list:
+            self.manager.iter_raw(per_page=10)
+
+        http_list.assert_called_once_with("/teams", per_page=10, iterator=True)
+
+    def test_when_list_fields_without_server_projection_project_on_client(self):
+        with patch.object(self.openbas, "http_list") as http_list:
+            self.manager.list(fields=["team_id"])
+
+        http_list.assert_called_once_with("/teams", fields=["team_id"])
+
+    def test_when_list_fields_with_server_projection_ask_server(self):
+        self.manager._projection_param = "fields"
+        with patch.object(self.openbas, "http_list") as http_list:
+            self.manager.list(fields=["team_id", "team_name"])
+
+        http_list.assert_called_once_with(
+            "/teams",
+            fields=["team_id", "team_name"],
+            query_data={"fields": "team_id,team_name"},
+        )
+
+    def test_count_read_total_from_head(self):
+        with patch.object(
+            self.openbas, "http_head", return_value={"X-Total": "42"}
+        ) as http_head:
+            self.assertEqual(self.manager.count(search="x"), 42)
+            self.assertEqual(self.manager.count(search="x"), 42)
+
+        http_head.assert_called_once_with("/teams", search="x", per_page=1)
+
+    def test_when_head_not_allowed_count_read_headers_of_get(self):
+        response = MagicMock()
+        response.headers = {"X-Total": "3"}
+        with (
+            patch.object(
+                self.openbas,
+                "http_head",
+                side_effect=OpenBASHttpError("", response_code=405),
+            ),
+            patch.object(
+                self.openbas, "http_request", return_value=response
+            ) as http_request,
+        ):
+            self.assertEqual(self.manager.count(), 3)
+
+        http_request.assert_called_once_with("get", "/teams", streamed=True, per_page=1)
+        response.json.assert_not_called()
+        response.close.assert_called_once()
+
+
+class TestGetMixin(unittest.TestCase):
+    def setUp(self):
+        self.openbas = OpenBAS(url="http://fake", token="fake")
+        self.manager = CollectorManager(self.openbas)
+
+    def test_exists_when_head_succeeds(self):
+        with patch.object(self.openbas, "http_head", return_value={}) as http_head:
+            self.assertTrue(self.manager.exists("abc"))
+            self.assertTrue(self.manager.exists("abc"))
+
+        http_head.assert_called_once_with("/collectors/abc")
+
+    def test_exists_when_not_found(self):
+        with patch.object(
+            self.openbas,
+            "http_head",
+            side_effect=OpenBASHttpError("", response_code=404),
+        ):
+            self.assertFalse(self.manager.exists("abc"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,207 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from pyobas.apis.inject_expectation import ExpectationStore
+from pyobas.apis.inject_expectation.model import (
+    DetectionExpectation,
+    build_expectations,
+)
+from pyobas.pipeline import (
+    FunctionStage,
+    MatchStage,
+    NormalizeStage,
+    Pipeline,
+    ResultSink,
+    SkipSeenStage,
+    Stage,
+    TraceSink,
+)
+from pyobas.seen_alerts import SeenAlertFilter
+from pyobas.signatures.signature_type import SignatureType
+from pyobas.signatures.types import MatchTypes, SignatureTypes
+
+HOSTNAME = SignatureType(
+    label=SignatureTypes.SIG_TYPE_HOSTNAME, match_type=MatchTypes.MATCH_TYPE_SIMPLE
+)
+
+
+def create_expectation(hostname, api_client):
+    return DetectionExpectation(
+        inject_expectation_id=uuid4(),
+        inject_expectation_signatures=[{"type": "hostname", "value": hostname}],
+        api_client=api_client,
+    )
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.api = MagicMock()
+        self.expectations = [
+            create_expectation("host-a", self.api.inject_expectation),
+            create_expectation("host-b", self.api.inject_expectation),
+        ]
+        self.alerts = [
+            {"id": 1, "host": "host-a"},
+            {"id": 2, "host": "host-c"},
+            {"id": 3, "host": "host-a"},
+            {"id": 4},
+        ]
+
+    def create_pipeline(self, threaded=False, queue_size=1):
+        return Pipeline(
+            source=lambda: self.alerts,
+            stages=[
+                NormalizeStage([HOSTNAME], lambda alert, _: alert.get("host")),
+                MatchStage(lambda: self.expectations, [HOSTNAME]),
+                ResultSink("collector"),
+                TraceSink(
+                    self.api,
+                    "collector",
+                    alert_name=lambda match: f"alert {match.alert['id']}",
+                    alert_link=lambda match: f"http://edr/{match.alert['id']}",
+                    batch_size=10,
+                ),
+            ],
+            threaded=threaded,
+            queue_size=queue_size,
+        )
+
+    def assert_run_matches_and_reports(self, pipeline):
+        self.assertEqual(pipeline.run(), 2)
+
+        self.api.inject_expectation.update.assert_called_once_with(
+            self.expectations[0].inject_expectation_id,
+            inject_expectation={
+                "collector_id": "collector",
+                "result": "Detected",
+                "is_success": True,
+                "metadata": {},
+            },
+        )
+        traces = self.api.inject_expectation_trace.bulk_create.call_args.kwargs[
+            "payload"
+        ]["expectation_traces"]
+        self.assertEqual(
+            [trace["inject_expectation_trace_alert_name"] for trace in traces],
+            ["alert 1", "alert 3"],
+        )
+        self.assertEqual(
+            [(m.name, m.received, m.emitted) for m in pipeline.metrics],
+            [
+                ("source", 4, 4),
+                ("NormalizeStage", 4, 3),
+                ("MatchStage", 3, 2),
+                ("ResultSink", 2, 2),
+                ("TraceSink", 2, 2),
+            ],
+        )
+
+    def test_run_inline(self):
+        self.assert_run_matches_and_reports(self.create_pipeline())
+
+    def test_run_threaded_with_bounded_queues(self):
+        self.assert_run_matches_and_reports(self.create_pipeline(threaded=True))
+
+    def test_with_a_store_rebuild_the_matcher_only_when_expectations_change(self):
+        expectation_dicts = [
+            {
+                "inject_expectation_id": str(uuid4()),
+                "inject_expectation_type": "DETECTION",
+                "inject_expectation_signatures": [
+                    {"type": "hostname", "value": "host-a"}
+                ],
+            }
+        ]
+        manager = MagicMock()
+        manager.expectations_assets_for_source.side_effect = lambda **_: list(
+            expectation_dicts
+        )
+        manager.expectation_models.side_effect = build_expectations
+        match_stage = MatchStage(ExpectationStore(manager, "collector"), [HOSTNAME])
+        pipeline = Pipeline(
+            source=lambda: self.alerts,
+            stages=[
+                NormalizeStage([HOSTNAME], lambda alert, _: alert.get("host")),
+                match_stage,
+            ],
+        )
+
+        self.assertEqual(pipeline.run(), 2)
+        matcher = match_stage.matcher
+        self.assertEqual(pipeline.run(), 2)
+        self.assertIs(match_stage.matcher, matcher)
+
+        expectation_dicts[0] = {
+            **expectation_dicts[0],
+            "inject_expectation_signatures": [{"type": "hostname", "value": "host-c"}],
+        }
+        self.assertEqual(pipeline.run(), 1)
+        self.assertIsNot(match_stage.matcher, matcher)
+
+    def test_skip_seen_alerts_across_runs(self):
+        pipeline = Pipeline(
+            lambda: self.alerts,
+            [SkipSeenStage(SeenAlertFilter(), key=lambda alert: str(alert["id"]))],
+        )
+
+        self.assertEqual(pipeline.run(), 4)
+        self.alerts.append({"id": 5})
+        self.assertEqual(pipeline.run(), 1)
+
+    def test_skip_seen_alerts_with_integer_ids(self):
+        skip_seen = SkipSeenStage(SeenAlertFilter(), key=lambda alert: alert["id"])
+        pipeline = Pipeline(lambda: self.alerts, [skip_seen])
+
+        self.assertEqual(pipeline.run(), 4)
+        self.assertEqual(skip_seen.metrics.errors, 0)
+        self.alerts.append({"id": 5})
+        self.assertEqual(pipeline.run(), 1)
+
+    def test_when_item_fails_count_error_and_continue(self):
+        def fail_on_two(item):
+            if item == 2:
+                raise ValueError("bad item")
+            return item
+
+        pipeline = Pipeline(lambda: [1, 2, 3], [FunctionStage(fail_on_two)])
+
+        self.assertEqual(pipeline.run(), 2)
+        self.assertEqual(pipeline.stages[0].metrics.errors, 1)
+
+    def test_when_threaded_stage_fails_raise_without_blocking(self):
+        class FailingFlush(Stage):
+            def flush(self):
+                raise ValueError("cannot flush")
+
+        class FailingStage(Stage):
+            def process(self, item):
+                yield item
+
+            def stream(self, items):
+                raise ValueError("broken stage")
+                yield
+
+        for stage in (FailingFlush(), FailingStage()):
+            pipeline = Pipeline(
+                lambda: range(100), [stage, Stage()], threaded=True, queue_size=1
+            )
+            with self.assertRaises(ValueError):
+                pipeline.run()
+        self.assertFalse(
+            [t for t in threading.enumerate() if t.name.startswith("pipeline-")]
+        )
+
+    def test_as_callback_runs_with_collector_logger(self):
+        pipeline = Pipeline(lambda: [1], [Stage()])
+        collector = MagicMock()
+
+        pipeline.as_callback()(collector=collector)
+
+        self.assertIs(pipeline.logger, collector.logger)
+        collector.logger.info.assert_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+
+from pyobas.seen_alerts import BloomFilter, SeenAlertFilter
+
+
+class TestBloomFilter(unittest.TestCase):
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom_filter.add(f"alert-{i}")
+
+        self.assertTrue(all(f"alert-{i}" in bloom_filter for i in range(1000)))
+        false_positives = sum(f"other-{i}" in bloom_filter for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_from_bytes_with_other_sizing_raises(self):
+        data = BloomFilter(capacity=10, error_rate=0.01).to_bytes()
+
+        with self.assertRaises(ValueError):
+            BloomFilter.from_bytes(data, capacity=1000, error_rate=0.01)
+
+
+class TestSeenAlertFilter(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.clock = lambda: self.now
+
+    def test_remember_alerts_for_one_to_two_rotations(self):
+        seen_alerts = SeenAlertFilter(rotation_seconds=10, clock=self.clock)
+
+        self.assertFalse(seen_alerts.check_and_add("a"))
+        self.assertTrue(seen_alerts.check_and_add("a"))
+        self.now = 15
+        self.assertIn("a", seen_alerts)
+        self.now = 25
+        self.assertNotIn("a", seen_alerts)
+
+    def test_when_full_rotate(self):
+        seen_alerts = SeenAlertFilter(capacity=2, clock=self.clock)
+        for alert_id in ("a", "b", "c", "d", "e"):
+            seen_alerts.add(alert_id)
+
+        self.assertNotIn("a", seen_alerts)
+        self.assertIn("e", seen_alerts)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "seen_alerts")
+            seen_alerts = SeenAlertFilter(path=path, clock=self.clock)
+            seen_alerts.add("a")
+            seen_alerts.save()
+
+            loaded = SeenAlertFilter(path=path, clock=self.clock)
+
+            self.assertIn("a", loaded)
+            self.assertNotIn("b", loaded)
+            self.assertEqual(os.listdir(directory), ["seen_alerts"])
+
+    def test_when_file_saved_with_other_sizing_start_empty(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "seen_alerts")
+            seen_alerts = SeenAlertFilter(capacity=1000, path=path, clock=self.clock)
+            seen_alerts.add("a")
+            seen_alerts.save()
+
+            with self.assertLogs("pyobas.seen_alerts", "WARNING"):
+                loaded = SeenAlertFilter(capacity=2000, path=path, clock=self.clock)
+
+            self.assertNotIn("a", loaded)
+            loaded.add("b")
+            loaded.save()
+            self.assertIn(
+                "b", SeenAlertFilter(capacity=2000, path=path, clock=self.clock)
+            )
+
+    def test_when_file_truncated_start_empty(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "seen_alerts")
+            with open(path, "wb") as file:
+                file.write(b"\x00" * 4)
+
+            with self.assertLogs("pyobas.seen_alerts", "WARNING"):
+                loaded = SeenAlertFilter(path=path, clock=self.clock)
+
+            self.assertNotIn("a", loaded)
+
+
+if __name__ == "__main__":
+    unittest.main()